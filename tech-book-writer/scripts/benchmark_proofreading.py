@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+校对性能基准 - 衡量 proofreading.py 的改动让检查变快还是变慢
+
+功能:
+- 按指定规模生成一本合成书籍（章节数、每章代码块数、图片数、段落长度可调），
+  目录结构与 BookProofreader 的要求一致: chapters/*.md + assets/chapterXX/images/
+- 对每个检查项分别计时 run_checks，重复多次取最快的一次
+- 结果追加到历史文件中，并与上一次相同规模的结果对比，标出变慢的检查项
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from proofreading import ALL_CHECKS, CHECKS_VERSION, BookProofreader
+
+# 默认的历史文件（位于当前目录）
+HISTORY_FILENAME = 'proofreading-benchmark.json'
+
+WORDS = ['数据', '模型', '训练', '特征', '参数', '函数', '变量', '循环', '列表', '字典',
+         '样本', '误差', '梯度', '网络', '矩阵', '向量', '文件', '接口', '结果', '示例']
+TERMS = ['基于', '进行', '实现']
+
+
+def make_code_block(rng, index, lines):
+    """生成一个 Python 代码块，少数带语法错误或缺少 import"""
+    kind = rng.random()
+    body = [f'# 示例 {index}']
+    if kind < 0.05:
+        body.append('def broken(:')
+    elif kind < 0.1:
+        body.append('df = pd.DataFrame()')
+    else:
+        body.append('import math')
+    for i in range(lines):
+        body.append(f'value_{i} = math.sqrt({rng.randint(1, 1000)}) * {i}')
+    return '```python\n' + '\n'.join(body) + '\n```\n'
+
+
+def make_paragraph(rng, lines):
+    """生成一个段落，偶尔出现学术术语"""
+    rows = []
+    for _ in range(lines):
+        words = rng.choices(WORDS, k=rng.randint(8, 16))
+        if rng.random() < 0.2:
+            words.insert(rng.randrange(len(words)), rng.choice(TERMS))
+        rows.append(''.join(words) + '。')
+    return '\n'.join(rows) + '\n'
+
+
+def generate_book(root, chapters=20, code_blocks=10, images=5, paragraphs=20,
+                  paragraph_lines=4, code_lines=12, seed=0):
+    """在 root 下生成合成书籍，返回章节目录
+
+    约 10% 的图片文件缺失、每章多一张未被引用的图片，部分代码块在章节间重复，
+    每章包含指向上一章的链接和一个 Mermaid 图表，使每个检查项都有实际工作量。
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    chapters_dir = root / 'chapters'
+    chapters_dir.mkdir(parents=True, exist_ok=True)
+    shared_blocks = [make_code_block(rng, i, code_lines) for i in range(code_blocks)]
+
+    for number in range(1, chapters + 1):
+        image_dir = root / 'assets' / f'chapter{number:02d}' / 'images'
+        image_dir.mkdir(parents=True, exist_ok=True)
+        parts = [f'# 第{number}章 合成章节\n', '## 本章导读\n', make_paragraph(rng, 2)]
+        if number > 1:
+            parts.append(f'回顾 [上一章](chapter{number - 1:02d}.md#本章小结)。\n')
+
+        parts.append('## 核心概念\n')
+        for index in range(paragraphs):
+            parts.append(make_paragraph(rng, paragraph_lines))
+            if index % 5 == 0:
+                parts.append(f'### 概念 {index}\n')
+
+        parts.append('## 实战案例\n')
+        for index in range(code_blocks):
+            # 约五分之一的代码块与其他章节共享
+            block = (shared_blocks[index] if rng.random() < 0.2
+                     else make_code_block(rng, index, code_lines))
+            parts.append(block)
+        for index in range(images):
+            name = f'{index + 1:02d}_figure.png'
+            if rng.random() >= 0.1:
+                (image_dir / name).write_bytes(b'')
+            parts.append(f'![图{index + 1}](../assets/chapter{number:02d}/images/{name})\n')
+        (image_dir / '99_unused.png').write_bytes(b'')
+        parts.append('```mermaid\nflowchart LR\n  A --> B\n```\n')
+
+        parts.append('## 本章小结\n')
+        parts.append(make_paragraph(rng, 3))
+        parts.append('## 章节测试\n')
+        parts.append(''.join(f'{i}. 问题 {i}\n' for i in range(1, 6)))
+        parts.append('## 参考答案\n')
+        parts.append(make_paragraph(rng, 2))
+
+        (chapters_dir / f'chapter{number:02d}.md').write_text('\n'.join(parts), encoding='utf-8')
+    return chapters_dir
+
+
+def time_check(chapters_dir, check, jobs, repeat):
+    """多次运行同一检查，返回最快一次的耗时（秒）"""
+    best = None
+    for _ in range(repeat):
+        proofreader = BookProofreader(chapters_dir)
+        started = time.perf_counter()
+        # 校对器的进度输出不计入结果，也不刷屏
+        with contextlib.redirect_stdout(io.StringIO()):
+            proofreader.run_checks(check, jobs=jobs)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark(params, checks, jobs=1, repeat=3, keep=None):
+    """生成书籍并逐项计时，返回 {检查项: 秒}"""
+    with tempfile.TemporaryDirectory(prefix='proofreading_bench_') as workdir:
+        root = Path(keep) if keep else Path(workdir)
+        chapters_dir = generate_book(root, **params)
+        results = {}
+        for check in checks:
+            results[check] = time_check(chapters_dir, check, jobs, repeat)
+            print(f"   {check:<12} {results[check] * 1000:9.1f} ms")
+        return results
+
+
+def load_history(path):
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def compare(previous, results, threshold):
+    """与上一次结果对比，打印变化，返回变慢超过阈值的检查项"""
+    print(f"\n📊 与上一次（{previous['label']}，{previous['time']}）对比:")
+    regressions = []
+    for check, seconds in results.items():
+        before = previous['results'].get(check)
+        if not before:
+            print(f"   {check:<12} {'(新增)':>10}")
+            continue
+        change = (seconds - before) / before
+        marker = ''
+        if change > threshold:
+            marker = ' ⚠️  变慢'
+            regressions.append(check)
+        elif change < -threshold:
+            marker = ' 🚀 变快'
+        print(f"   {check:<12} {before * 1000:9.1f} → {seconds * 1000:9.1f} ms ({change:+.0%}){marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='校对脚本性能基准')
+    parser.add_argument('--chapters', type=int, default=20, help='章节数')
+    parser.add_argument('--code-blocks', type=int, default=10, help='每章代码块数')
+    parser.add_argument('--code-lines', type=int, default=12, help='每个代码块的行数')
+    parser.add_argument('--images', type=int, default=5, help='每章图片引用数')
+    parser.add_argument('--paragraphs', type=int, default=20, help='每章段落数')
+    parser.add_argument('--paragraph-lines', type=int, default=4, help='每个段落的行数')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子（相同种子生成相同的书）')
+    parser.add_argument('--checks', default=','.join(ALL_CHECKS + ['all']),
+                        help='要计时的检查项，逗号分隔（all 表示全部检查一起运行）')
+    parser.add_argument('--jobs', type=int, default=1, help='校对使用的进程数')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数，取最快的一次')
+    parser.add_argument('--label', help='本次结果的标签（如版本号或提交号）')
+    parser.add_argument('--history', default=HISTORY_FILENAME, help='历史结果文件')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='变慢超过该比例时视为性能回退（默认0.1即10%%）')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='出现性能回退时以非零状态退出（用于CI）')
+    parser.add_argument('--keep', help='把生成的书籍保存到该目录，便于复现')
+
+    args = parser.parse_args()
+
+    params = {
+        'chapters': args.chapters,
+        'code_blocks': args.code_blocks,
+        'code_lines': args.code_lines,
+        'images': args.images,
+        'paragraphs': args.paragraphs,
+        'paragraph_lines': args.paragraph_lines,
+        'seed': args.seed,
+    }
+    checks = [check.strip() for check in args.checks.split(',') if check.strip()]
+
+    print(f"⏱️  生成合成书籍并计时: {args.chapters}章 × {args.code_blocks}个代码块 × "
+          f"{args.images}张图片，重复{args.repeat}次")
+    results = run_benchmark(params, checks, jobs=args.jobs, repeat=args.repeat, keep=args.keep)
+
+    history_path = Path(args.history)
+    history = load_history(history_path)
+    entry = {
+        'label': args.label or f'checks-v{CHECKS_VERSION}',
+        'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'jobs': args.jobs,
+        'params': params,
+        'results': results,
+    }
+
+    # 只与相同规模、相同进程数的历史结果对比
+    previous = next((item for item in reversed(history)
+                     if item['params'] == params and item['jobs'] == args.jobs), None)
+    regressions = []
+    if previous:
+        regressions = compare(previous, results, args.threshold)
+    else:
+        print("\n📊 没有相同规模的历史结果，本次作为基线")
+
+    history.append(entry)
+    save_history(history_path, history)
+    print(f"📄 结果已追加到: {history_path}")
+
+    if regressions:
+        print(f"⚠️  性能回退: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
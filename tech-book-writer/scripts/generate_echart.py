@@ -8,34 +8,179 @@
 - pie: 饼图
 - scatter: 散点图
 - radar: 雷达图
+
+批量模式: --manifest charts.yaml 在一个进程中生成清单中的所有图表，
+导出图片时整批共用一个浏览器池并发渲染。
+导出服务: --serve 让浏览器池常驻，之后的调用把图片导出交给它。
+数据文件: JSON，或 CSV/TSV、NDJSON、Parquet/Arrow、.npy（按列读取，--x/--y 选择列）。
+多图表页面: 清单中指定 dashboard 的图表放进同一个页面，导出时一次加载逐个截取。
+降采样: 指定 --max-points（或清单中的 max_points）后，折线图（LTTB）和散点图（网格合并）的
+点数超过该值时先降采样再写入页面（需要 numpy）；默认不降采样，数据原样写入。
 """
 
 import json
 import argparse
+import array
+import asyncio
+import csv
+import itertools
+import hashlib
+import html
+import math
+import os
+import shutil
+import urllib.request
+import socket
+import stat
 import subprocess
 import tempfile
+import time
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:  # 没有 numpy 时不降采样
+    np = None
 
-def generate_bar_chart(data, title, output_path):
-    """生成柱状图"""
-    x_axis = data.get('xAxis', [])
-    series = data.get('series', [])
-    
-    series_data = []
-    for s in series:
-        series_data.append({
-            'name': s.get('name', ''),
-            'type': 'bar',
-            'data': s.get('data', [])
-        })
-    
-    html_content = f"""<!DOCTYPE html>
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，渲染缓存索引不加锁
+    fcntl = None
+
+
+# 导出图片时等待图表渲染完成的默认最长时间（秒）
+RENDER_TIMEOUT = 10
+
+# 导出图片的视口大小
+VIEWPORT = {'width': 1200, 'height': 700}
+
+# 未安装 playwright 时 export_images 对每个页面返回的结果：跳过导出，不算失败
+EXPORT_SKIPPED = '未安装 playwright，跳过图片导出'
+
+# 页面模板变化时递增，使渲染缓存失效
+TEMPLATE_VERSION = '2'
+
+# 折线图、散点图每张图表写入页面的默认最大点数（0 表示不降采样）。
+# 降采样会改变图表内容，默认关闭，由 --max-points 或清单中的 max_points 显式开启
+MAX_POINTS = 0
+
+# 渲染缓存默认大小上限（MB）
+RENDER_CACHE_SIZE = 512
+
+# 固定使用的 ECharts 版本
+ECHARTS_VERSION = '5.4.3'
+ECHARTS_CDN = f'https://cdn.jsdelivr.net/npm/echarts@{ECHARTS_VERSION}/dist/echarts.min.js'
+ECHARTS_FILENAME = f'echarts-{ECHARTS_VERSION}.min.js'
+# 官方发布的 echarts@5.4.3 dist/echarts.min.js 的 SHA-256，--fetch-echarts 默认按它校验
+ECHARTS_SHA256 = '1156429a16a38cb8604dcc6518c19406d4226142d908f8edd2e3531443c54d19'
+# 本地 ECharts 的存放目录（可用环境变量 ECHARTS_CACHE_DIR 修改）
+ECHARTS_CACHE_DIR = Path(os.environ.get('ECHARTS_CACHE_DIR',
+                                        Path.home() / '.cache' / 'tech-book-writer'))
+
+
+class EchartsRuntime:
+    """生成的页面如何加载 ECharts
+
+    - cdn: 从 jsdelivr 加载（默认，需要联网）
+    - inline: 把本地 ECharts 内嵌到每个 HTML 中，页面完全独立
+    - local: 在每个输出目录放一份本地 ECharts，同目录的图表共用
+
+    本地 ECharts 通过 --fetch-echarts 获取，按固定的 ECHARTS_SHA256 校验后记录其 SHA-256；
+    每次使用前都会校验，内容不符时拒绝生成。
+    """
+
+    MODES = ('cdn', 'inline', 'local')
+
+    def __init__(self, mode='cdn', cache_dir=None):
+        if mode not in self.MODES:
+            raise ValueError(f'未知的 ECharts 加载方式: {mode}')
+        self.mode = mode
+        self.bundle_path = Path(cache_dir or ECHARTS_CACHE_DIR) / ECHARTS_FILENAME
+        self._bundle = None
+        # local 模式下已经放好 ECharts 的输出目录
+        self._shared_dirs = set()
+
+    @property
+    def checksum_path(self):
+        return self.bundle_path.with_name(self.bundle_path.name + '.sha256')
+
+    def bundle(self):
+        """读取并校验本地 ECharts，整个进程只读取一次"""
+        if self._bundle is None:
+            if not self.bundle_path.exists() or not self.checksum_path.exists():
+                raise FileNotFoundError(
+                    f'未找到本地 ECharts {ECHARTS_VERSION}: {self.bundle_path}，'
+                    f'请先运行 --fetch-echarts')
+            content = self.bundle_path.read_bytes()
+            expected = self.checksum_path.read_text(encoding='utf-8').split()[0]
+            if hashlib.sha256(content).hexdigest() != expected:
+                raise ValueError(f'本地 ECharts 校验失败（SHA-256 不符）: {self.bundle_path}')
+            self._bundle = content
+        return self._bundle
+
+    def script_tag(self, output_path):
+        """生成页面中加载 ECharts 的 <script> 标签"""
+        if self.mode == 'cdn':
+            return f'<script src="{ECHARTS_CDN}"></script>'
+        bundle = self.bundle()
+        if self.mode == 'inline':
+            # 脚本内容中的 </script 会提前结束标签，需要转义
+            code = bundle.decode('utf-8').replace('</script', '<\\/script')
+            return f'<script>{code}</script>'
+        output_dir = Path(output_path).resolve().parent
+        if output_dir not in self._shared_dirs:
+            target = output_dir / ECHARTS_FILENAME
+            if not target.exists() or target.read_bytes() != bundle:
+                output_dir.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(self.bundle_path, target)
+            self._shared_dirs.add(output_dir)
+        return f'<script src="{ECHARTS_FILENAME}"></script>'
+
+
+def fetch_echarts(source=None, sha256=None, cache_dir=None):
+    """获取 ECharts 并保存到本地缓存目录，同时记录 SHA-256
+
+    source 可以是 URL 或已下载好的文件（离线机器可从其他机器拷贝）；
+    内容与 sha256（默认 ECHARTS_SHA256）不符时拒绝保存。使用自行构建的
+    ECharts 时通过 sha256 指定它的校验值。
+    """
+    runtime = EchartsRuntime('local', cache_dir)
+    source = source or ECHARTS_CDN
+    if '://' in source:
+        with urllib.request.urlopen(source, timeout=60) as response:
+            content = response.read()
+    else:
+        content = Path(source).read_bytes()
+
+    digest = hashlib.sha256(content).hexdigest()
+    expected = (sha256 or ECHARTS_SHA256).lower()
+    if digest != expected:
+        raise ValueError(f'SHA-256 不符: 期望 {expected}，实际 {digest}'
+                         f'（不是 ECharts {ECHARTS_VERSION} 的官方 dist/echarts.min.js）')
+
+    runtime.bundle_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = runtime.bundle_path.with_name(runtime.bundle_path.name + '.tmp')
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, runtime.bundle_path)
+    runtime.checksum_path.write_text(f'{digest}  {ECHARTS_FILENAME}\n', encoding='utf-8')
+    return runtime.bundle_path, digest
+
+
+# 未指定加载方式时使用 CDN，与旧版本生成的页面一致
+CDN_RUNTIME = EchartsRuntime('cdn')
+
+
+def echarts_script(output_path, runtime=None):
+    return (runtime or CDN_RUNTIME).script_tag(output_path)
+
+
+# 所有图表共用的页面模板；option 由各图表类型的构建函数生成，整体序列化一次后填入
+PAGE_TEMPLATE = """<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
     <title>{title}</title>
-    <script src="https://cdn.jsdelivr.net/npm/echarts@5.4.3/dist/echarts.min.js"></script>
+    {script}
     <style>
         body {{ margin: 0; padding: 20px; background: #fff; }}
         #main {{ width: 100%; height: 600px; }}
@@ -44,402 +189,1315 @@ def generate_bar_chart(data, title, output_path):
 <body>
     <div id="main"></div>
     <script type="text/javascript">
-        var chartDom = document.getElementById('main');
-        var myChart = echarts.init(chartDom);
-        var option = {{
-            title: {{
-                text: '{title}',
-                left: 'center',
-                textStyle: {{
-                    fontSize: 20,
-                    fontWeight: 'bold'
-                }}
-            }},
-            tooltip: {{
-                trigger: 'axis',
-                axisPointer: {{
-                    type: 'shadow'
-                }}
-            }},
-            legend: {{
-                top: '10%',
-                data: {json.dumps([s['name'] for s in series_data])}
-            }},
-            grid: {{
-                left: '3%',
-                right: '4%',
-                bottom: '3%',
-                containLabel: true
-            }},
-            xAxis: {{
-                type: 'category',
-                data: {json.dumps(x_axis)}
-            }},
-            yAxis: {{
-                type: 'value'
-            }},
-            series: {json.dumps(series_data)}
-        }};
-        
+        // 渲染完成信号：导出图片时等待它变为 true，而不是固定等待
+        window.__chartReady = false;
+        var myChart = echarts.init(document.getElementById('main'));
+        var option = {option};
+        myChart.on('finished', function() {{
+            window.__chartReady = true;
+        }});
         myChart.setOption(option);
         window.addEventListener('resize', function() {{
             myChart.resize();
         }});
     </script>
 </body>
-</html>"""
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    print(f"✅ 柱状图已生成: {output_path}")
-
+</html>
+"""
 
-def generate_line_chart(data, title, output_path):
-    """生成折线图"""
-    x_axis = data.get('xAxis', [])
-    series = data.get('series', [])
-    
-    series_data = []
-    for s in series:
-        series_data.append({
-            'name': s.get('name', ''),
-            'type': 'line',
-            'data': s.get('data', []),
-            'smooth': True
-        })
-    
-    html_content = f"""<!DOCTYPE html>
+# 多图表页面模板：每张图表放在与单图页面视口同样大小的框中，截取的图片与单独导出的一致
+DASHBOARD_TEMPLATE = """<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
     <title>{title}</title>
-    <script src="https://cdn.jsdelivr.net/npm/echarts@5.4.3/dist/echarts.min.js"></script>
+    {script}
     <style>
-        body {{ margin: 0; padding: 20px; background: #fff; }}
-        #main {{ width: 100%; height: 600px; }}
+        body {{ margin: 0; background: #fff; }}
+        .frame {{ box-sizing: border-box; width: {width}px; height: {height}px; padding: 20px; }}
+        .chart {{ width: 100%; height: 600px; }}
     </style>
 </head>
 <body>
-    <div id="main"></div>
+{frames}
     <script type="text/javascript">
-        var chartDom = document.getElementById('main');
-        var myChart = echarts.init(chartDom);
-        var option = {{
-            title: {{
-                text: '{title}',
-                left: 'center'
-            }},
-            tooltip: {{
-                trigger: 'axis'
-            }},
-            legend: {{
-                top: '10%',
-                data: {json.dumps([s['name'] for s in series_data])}
-            }},
-            grid: {{
-                left: '3%',
-                right: '4%',
-                bottom: '3%',
-                containLabel: true
-            }},
-            xAxis: {{
-                type: 'category',
-                data: {json.dumps(x_axis)}
-            }},
-            yAxis: {{
-                type: 'value'
-            }},
-            series: {json.dumps(series_data)}
-        }};
-        
-        myChart.setOption(option);
-        window.addEventListener('resize', function() {{
-            myChart.resize();
+        // 所有图表都触发过 finished 事件后才设置渲染完成信号
+        window.__chartReady = false;
+        var options = {options};
+        var pending = options.length;
+        options.forEach(function(option, index) {{
+            var chart = echarts.init(document.getElementById('chart-' + (index + 1)));
+            chart.on('finished', function() {{
+                chart.off('finished');
+                if (--pending === 0) {{
+                    window.__chartReady = true;
+                }}
+            }});
+            chart.setOption(option);
         }});
     </script>
 </body>
-</html>"""
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    print(f"✅ 折线图已生成: {output_path}")
+</html>
+"""
 
+AXIS_GRID = {'left': '3%', 'right': '4%', 'bottom': '3%', 'containLabel': True}
 
-def generate_pie_chart(data, title, output_path):
-    """生成饼图"""
-    pie_data = data.get('data', [])
 
-    html_content = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>{title}</title>
-    <script src="https://cdn.jsdelivr.net/npm/echarts@5.4.3/dist/echarts.min.js"></script>
-    <style>
-        body {{ margin: 0; padding: 20px; background: #fff; }}
-        #main {{ width: 100%; height: 600px; }}
-    </style>
-</head>
-<body>
-    <div id="main"></div>
-    <script type="text/javascript">
-        var chartDom = document.getElementById('main');
-        var myChart = echarts.init(chartDom);
-        var option = {{
-            title: {{
-                text: '{title}',
-                left: 'center'
-            }},
-            tooltip: {{
-                trigger: 'item',
-                formatter: '{{a}} <br/>{{b}}: {{c}} ({{d}}%)'
-            }},
-            legend: {{
-                orient: 'vertical',
-                left: 'left'
-            }},
-            series: [
-                {{
-                    name: '{title}',
-                    type: 'pie',
-                    radius: '55%',
-                    center: ['50%', '60%'],
-                    data: {json.dumps(pie_data)},
-                    emphasis: {{
-                        itemStyle: {{
-                            shadowBlur: 10,
-                            shadowOffsetX: 0,
-                            shadowColor: 'rgba(0, 0, 0, 0.5)'
-                        }}
-                    }}
-                }}
-            ]
-        }};
+def bar_option(data, title):
+    """柱状图"""
+    series = [{'name': s.get('name', ''), 'type': 'bar', 'data': s.get('data', [])}
+              for s in data.get('series', [])]
+    return {
+        'title': {'text': title, 'left': 'center',
+                  'textStyle': {'fontSize': 20, 'fontWeight': 'bold'}},
+        'tooltip': {'trigger': 'axis', 'axisPointer': {'type': 'shadow'}},
+        'legend': {'top': '10%', 'data': [s['name'] for s in series]},
+        'grid': AXIS_GRID,
+        'xAxis': {'type': 'category', 'data': data.get('xAxis', [])},
+        'yAxis': {'type': 'value'},
+        'series': series,
+    }
 
-        myChart.setOption(option);
-        window.addEventListener('resize', function() {{
-            myChart.resize();
-        }});
-    </script>
-</body>
-</html>"""
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    print(f"✅ 饼图已生成: {output_path}")
+def line_option(data, title):
+    """折线图"""
+    series = [{'name': s.get('name', ''), 'type': 'line', 'data': s.get('data', []), 'smooth': True}
+              for s in data.get('series', [])]
+    return {
+        'title': {'text': title, 'left': 'center'},
+        'tooltip': {'trigger': 'axis'},
+        'legend': {'top': '10%', 'data': [s['name'] for s in series]},
+        'grid': AXIS_GRID,
+        'xAxis': {'type': 'category', 'data': data.get('xAxis', [])},
+        'yAxis': {'type': 'value'},
+        'series': series,
+    }
 
 
-def generate_scatter_chart(data, title, output_path):
-    """生成散点图"""
-    series = data.get('series', [])
+def pie_option(data, title):
+    """饼图"""
+    return {
+        'title': {'text': title, 'left': 'center'},
+        'tooltip': {'trigger': 'item', 'formatter': '{a} <br/>{b}: {c} ({d}%)'},
+        'legend': {'orient': 'vertical', 'left': 'left'},
+        'series': [{
+            'name': title,
+            'type': 'pie',
+            'radius': '55%',
+            'center': ['50%', '60%'],
+            'data': data.get('data', []),
+            'emphasis': {'itemStyle': {'shadowBlur': 10, 'shadowOffsetX': 0,
+                                       'shadowColor': 'rgba(0, 0, 0, 0.5)'}},
+        }],
+    }
+
 
-    series_data = []
-    for s in series:
-        series_data.append({
+def scatter_option(data, title):
+    """散点图（降采样合并后的点带第三个值: 点数）"""
+    series = []
+    for s in data.get('series', []):
+        points = s.get('data', [])
+        dimensions = ['X', 'Y', '点数'] if points and len(points[0]) > 2 else ['X', 'Y']
+        series.append({
             'name': s.get('name', ''),
             'type': 'scatter',
-            'data': s.get('data', []),
-            'symbolSize': 10
+            'data': points,
+            'symbolSize': 10,
+            'dimensions': dimensions,
+            'encode': {'x': 0, 'y': 1, 'tooltip': list(range(len(dimensions)))},
         })
+    return {
+        'title': {'text': title, 'left': 'center'},
+        'tooltip': {'trigger': 'item'},
+        'legend': {'top': '10%', 'data': [s['name'] for s in series]},
+        'grid': {**AXIS_GRID, 'right': '7%'},
+        'xAxis': {'type': 'value', 'scale': True, 'name': 'X轴'},
+        'yAxis': {'type': 'value', 'scale': True, 'name': 'Y轴'},
+        'series': series,
+    }
 
-    html_content = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>{title}</title>
-    <script src="https://cdn.jsdelivr.net/npm/echarts@5.4.3/dist/echarts.min.js"></script>
-    <style>
-        body {{ margin: 0; padding: 20px; background: #fff; }}
-        #main {{ width: 100%; height: 600px; }}
-    </style>
-</head>
-<body>
-    <div id="main"></div>
-    <script type="text/javascript">
-        var chartDom = document.getElementById('main');
-        var myChart = echarts.init(chartDom);
-        var option = {{
-            title: {{
-                text: '{title}',
-                left: 'center'
-            }},
-            tooltip: {{
-                trigger: 'item',
-                formatter: function (params) {{
-                    return params.seriesName + '<br/>' +
-                           'X: ' + params.value[0] + '<br/>' +
-                           'Y: ' + params.value[1];
-                }}
-            }},
-            legend: {{
-                top: '10%',
-                data: {json.dumps([s['name'] for s in series_data])}
-            }},
-            grid: {{
-                left: '3%',
-                right: '7%',
-                bottom: '3%',
-                containLabel: true
-            }},
-            xAxis: {{
-                type: 'value',
-                scale: true,
-                name: 'X轴'
-            }},
-            yAxis: {{
-                type: 'value',
-                scale: true,
-                name: 'Y轴'
-            }},
-            series: {json.dumps(series_data)}
-        }};
 
-        myChart.setOption(option);
-        window.addEventListener('resize', function() {{
-            myChart.resize();
-        }});
-    </script>
-</body>
-</html>"""
+def radar_option(data, title):
+    """雷达图"""
+    series = [{'name': s.get('name', ''), 'value': s.get('data', []), 'type': 'radar'}
+              for s in data.get('series', [])]
+    return {
+        'title': {'text': title, 'left': 'center'},
+        'tooltip': {'trigger': 'item'},
+        'legend': {'top': '10%', 'data': [s['name'] for s in series]},
+        'radar': {'indicator': data.get('indicators', [])},
+        'series': [{'name': title, 'type': 'radar', 'data': series}],
+    }
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    print(f"✅ 散点图已生成: {output_path}")
 
+# 图表类型 -> (名称, option 构建函数)；新增图表类型只需写一个构建函数并登记在这里
+CHART_TYPES = {
+    'bar': ('柱状图', bar_option),
+    'line': ('折线图', line_option),
+    'pie': ('饼图', pie_option),
+    'scatter': ('散点图', scatter_option),
+    'radar': ('雷达图', radar_option),
+}
 
-def generate_radar_chart(data, title, output_path):
-    """生成雷达图"""
-    indicators = data.get('indicators', [])
-    series = data.get('series', [])
 
-    series_data = []
-    for s in series:
-        series_data.append({
-            'name': s.get('name', ''),
-            'value': s.get('data', []),
-            'type': 'radar'
-        })
+def serialize_option(option):
+    """把 option 序列化为可以直接写入 <script> 的 JSON
 
-    html_content = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>{title}</title>
-    <script src="https://cdn.jsdelivr.net/npm/echarts@5.4.3/dist/echarts.min.js"></script>
-    <style>
-        body {{ margin: 0; padding: 20px; background: #fff; }}
-        #main {{ width: 100%; height: 600px; }}
-    </style>
-</head>
-<body>
-    <div id="main"></div>
-    <script type="text/javascript">
-        var chartDom = document.getElementById('main');
-        var myChart = echarts.init(chartDom);
-        var option = {{
-            title: {{
-                text: '{title}',
-                left: 'center'
-            }},
-            tooltip: {{
-                trigger: 'item'
-            }},
-            legend: {{
-                top: '10%',
-                data: {json.dumps([s['name'] for s in series_data])}
-            }},
-            radar: {{
-                indicator: {json.dumps(indicators)}
-            }},
-            series: [{{
-                name: '{title}',
-                type: 'radar',
-                data: {json.dumps(series_data)}
-            }}]
-        }};
+    输入相同则输出的字节相同；字符串中的 < 写为 \\u003c，标题等文本无法提前结束脚本标签。
+    """
+    return json.dumps(option, ensure_ascii=False, separators=(',', ':')).replace('<', '\\u003c')
+
+
+def render_page(chart_type, data, title, output_path, runtime=None):
+    """生成图表页面的 HTML"""
+    _, build = CHART_TYPES[chart_type]
+    return PAGE_TEMPLATE.format(title=html.escape(str(title)),
+                                script=echarts_script(output_path, runtime),
+                                option=serialize_option(build(data, title)))
 
-        myChart.setOption(option);
-        window.addEventListener('resize', function() {{
-            myChart.resize();
-        }});
-    </script>
-</body>
-</html>"""
 
+def render_dashboard_page(charts, title, output_path, runtime=None):
+    """生成多图表页面的 HTML，charts 为 [(图表类型, 数据, 标题)]"""
+    frames = '\n'.join(f'    <div class="frame" id="frame-{number}"><div class="chart" id="chart-{number}">'
+                       f'</div></div>' for number in range(1, len(charts) + 1))
+    options = ','.join(serialize_option(CHART_TYPES[chart_type][1](data, chart_title))
+                       for chart_type, data, chart_title in charts)
+    return DASHBOARD_TEMPLATE.format(title=html.escape(str(title)),
+                                     script=echarts_script(output_path, runtime),
+                                     width=VIEWPORT['width'], height=VIEWPORT['height'],
+                                     frames=frames, options=f'[{options}]')
+
+
+def generate_chart(chart_type, data, title, output_path, runtime=None):
+    """生成图表 HTML 文件"""
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    print(f"✅ 雷达图已生成: {output_path}")
+        f.write(render_page(chart_type, data, title, output_path, runtime))
+    print(f"✅ {CHART_TYPES[chart_type][0]}已生成: {output_path}")
+
+
+class BrowserPool:
+    """常驻的无头浏览器池：保持若干个 Chromium 实例，页面在独立的浏览器上下文中并发渲染
+
+    browsers 个浏览器实例各自最多同时渲染 pages 个页面。批量模式下整批共用一个池，
+    导出服务（--serve）则让池一直保持运行。
+    """
+
+    def __init__(self, browsers=2, pages=2, render_timeout=RENDER_TIMEOUT):
+        self.browsers = browsers
+        self.pages = pages
+        self.render_timeout = render_timeout
+        self._playwright = None
+        self._timeout_error = None
+        self._instances = []
+        self._slots = None
+        # 崩溃的浏览器 -> 重新启动的实例，同一个实例的多个空位只重启一次
+        self._replacements = {}
+        self._relaunch_lock = None
+
+    async def start(self):
+        from playwright.async_api import async_playwright, TimeoutError
+        self._timeout_error = TimeoutError
+        self._playwright = await async_playwright().start()
+        self._instances = [await self._playwright.chromium.launch() for _ in range(self.browsers)]
+        self._relaunch_lock = asyncio.Lock()
+        # 每个空位对应一个浏览器实例上的一次并发渲染
+        self._slots = asyncio.Queue()
+        for _ in range(self.pages):
+            for browser in self._instances:
+                self._slots.put_nowait(browser)
+
+    async def _healthy(self, browser):
+        """浏览器崩溃或断开时重新启动一个实例代替它，返回可用的浏览器"""
+        if browser.is_connected():
+            return browser
+        async with self._relaunch_lock:
+            if browser in self._replacements:
+                return self._replacements[browser]
+            try:
+                replacement = await self._playwright.chromium.launch()
+            except Exception as e:
+                print(f"⚠️  重新启动浏览器失败: {e}")
+                return browser  # 下一次取到这个空位时再试
+            self._replacements[browser] = replacement
+            self._instances[self._instances.index(browser)] = replacement
+            print("♻️  浏览器已断开，已重新启动")
+            return replacement
+
+    async def export(self, html_path, output_path, render_timeout=None):
+        """导出一个页面，返回错误信息，成功时返回 None
+
+        output_path 为图片路径时截取整个视口；为 [(元素选择器, 图片路径)] 时
+        （多图表页面）页面只加载一次，逐个截取各元素。
+        """
+        render_timeout = render_timeout or self.render_timeout
+        browser = await self._healthy(await self._slots.get())
+        try:
+            context = await browser.new_context(viewport=VIEWPORT)
+            try:
+                page = await context.new_page()
+                await page.goto(Path(html_path).resolve().as_uri())
+
+                # 等待页面发出渲染完成信号（ECharts 的 finished 事件，动画结束后触发）
+                try:
+                    await page.wait_for_function('window.__chartReady !== false',
+                                                 timeout=render_timeout * 1000)
+                except self._timeout_error:
+                    return f'图表渲染超时（{render_timeout}秒）'
+                if not await page.evaluate('window.__chartReady === true'):
+                    # 旧版本生成的页面没有渲染完成信号，只能固定等待
+                    await page.wait_for_selector('#main', timeout=5000)
+                    await asyncio.sleep(1)
+
+                # 截图
+                if isinstance(output_path, (list, tuple)):
+                    for selector, image_path in output_path:
+                        await page.locator(selector).screenshot(path=str(image_path))
+                else:
+                    await page.screenshot(path=str(output_path), full_page=False)
+            finally:
+                await context.close()
+            return None
+        except Exception as e:
+            return str(e) or type(e).__name__
+        finally:
+            self._slots.put_nowait(browser)
+
+    async def export_all(self, jobs, render_timeout=None):
+        """并发导出 [(HTML路径, 导出目标)]，按顺序返回每个页面的错误信息（成功为 None）"""
+        return await asyncio.gather(*(self.export(html_path, output_path, render_timeout)
+                                      for html_path, output_path in jobs))
+
+    async def close(self):
+        for browser in self._instances:
+            try:
+                await browser.close()
+            except Exception:
+                pass  # 已经崩溃的浏览器
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._instances, self._playwright = [], None
+
+
+def default_socket_path():
+    """导出服务的 Unix 套接字路径（每个用户一个）
+
+    优先放在只有当前用户能访问的 $XDG_RUNTIME_DIR 中，否则放在临时目录下
+    当前用户独占（权限 0700）的目录中，其他用户无法抢先创建或替换套接字。
+    """
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and Path(runtime_dir).is_dir():
+        return Path(runtime_dir) / 'generate_echart.sock'
+    user = os.getuid() if hasattr(os, 'getuid') else 'user'
+    return Path(tempfile.gettempdir()) / f'generate_echart-{user}' / 'export.sock'
+
+
+def _private_directory(directory):
+    """创建（或确认）只有当前用户能访问的目录，目录属于其他用户或对其他用户开放时抛出 OSError"""
+    directory = Path(directory)
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise OSError(f'{directory} 不是当前用户的目录')
+    if info.st_mode & 0o077:
+        os.chmod(directory, 0o700)
+
+
+def _own_socket(socket_path):
+    """套接字是否由当前用户创建（只连接自己的导出服务）"""
+    try:
+        info = os.lstat(socket_path)
+    except OSError:
+        return False
+    if stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid():
+        return True
+    print(f"⚠️  忽略不属于当前用户的导出服务套接字: {socket_path}")
+    return False
+
+
+async def serve(socket_path, browsers=2, pages=2, render_timeout=RENDER_TIMEOUT):
+    """常驻导出服务：浏览器池保持运行，其他 generate_echart.py 进程把导出任务交给它
+
+    协议为每行一个 JSON：请求 {"jobs": [[HTML路径, 图片路径], ...], "timeout": 秒} 或 {"stop": true}，
+    响应 {"results": [错误信息或 null, ...]}。多图表页面的图片路径为 [[元素选择器, 图片路径], ...]。
+    """
+    socket_path = Path(socket_path)
+    if request_server(socket_path, {'ping': True}) is not None:
+        print(f"⚠️  导出服务已在运行: {socket_path}")
+        return
+    if socket_path == default_socket_path():
+        _private_directory(socket_path.parent)
+    socket_path.unlink(missing_ok=True)  # 上次异常退出留下的套接字文件
+
+    pool = BrowserPool(browsers, pages, render_timeout)
+    await pool.start()
+    stop = asyncio.Event()
+
+    async def handle(reader, writer):
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                if request.get('stop'):
+                    response = {'stopped': True}
+                elif request.get('ping'):
+                    response = {'pong': True}
+                else:
+                    response = {'results': await pool.export_all(request['jobs'],
+                                                                 request.get('timeout'))}
+                writer.write((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+                await writer.drain()
+                if request.get('stop'):
+                    stop.set()
+                    break
+        except (asyncio.CancelledError, ConnectionError, ValueError):
+            pass  # 服务停止或客户端断开
+        finally:
+            writer.close()
+
+    server = await asyncio.start_unix_server(handle, path=str(socket_path))
+    # 只允许当前用户提交任务
+    os.chmod(socket_path, 0o600)
+    print(f"🚀 图表导出服务已启动: {socket_path} （{browsers}个浏览器，每个并发{pages}页，Ctrl+C 退出）")
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        await pool.close()
+        socket_path.unlink(missing_ok=True)
+        print("👋 图表导出服务已停止")
+
+
+def request_server(socket_path, request):
+    """向导出服务发送一个请求，服务未运行时返回 None
+
+    套接字不是当前用户创建的也返回 None：不把图片路径交给其他用户的进程，也不相信它返回的结果。
+    """
+    if not hasattr(socket, 'AF_UNIX') or not Path(socket_path).exists():
+        return None
+    if not _own_socket(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(socket_path))
+            sock.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+            with sock.makefile('r', encoding='utf-8') as f:
+                return json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+
+
+async def _export_with_pool(jobs, browsers, pages, render_timeout):
+    pool = BrowserPool(min(browsers, len(jobs)), pages, render_timeout)
+    try:
+        await pool.start()
+        return await pool.export_all(jobs)
+    finally:
+        await pool.close()
+
+
+def _image_paths(target):
+    """导出目标中的所有图片路径"""
+    if isinstance(target, (list, tuple)):
+        return [image_path for _, image_path in target]
+    return [target]
+
+
+def export_images(jobs, browsers=2, pages=2, socket_path=None, render_timeout=RENDER_TIMEOUT):
+    """导出一批图表图片，返回每个页面的错误信息（成功为 None，未安装 playwright 为 EXPORT_SKIPPED）
+
+    jobs 为 [(HTML路径, 图片路径或 [(元素选择器, 图片路径)])]。
+    导出服务在运行时把任务交给它（浏览器已经热启动）；否则在本进程中
+    临时启动一个浏览器池，整批导出完再关闭。
+    """
+    if not jobs:
+        return []
+    jobs = [[str(Path(html_path).resolve()),
+             [[selector, str(Path(image_path).resolve())] for selector, image_path in target]
+             if isinstance(target, (list, tuple)) else str(Path(target).resolve())]
+            for html_path, target in jobs]
+
+    response = request_server(socket_path or default_socket_path(),
+                              {'jobs': jobs, 'timeout': render_timeout})
+    if response is not None and 'results' in response:
+        results = response['results']
+    else:
+        try:
+            import playwright.async_api  # noqa: F401
+        except ImportError:
+            print(f"⚠️  {EXPORT_SKIPPED}")
+            print("💡 安装方法: pip install playwright && playwright install chromium")
+            return [EXPORT_SKIPPED] * len(jobs)
+        try:
+            results = asyncio.run(_export_with_pool(jobs, browsers, pages, render_timeout))
+        except Exception as e:
+            results = [str(e) or type(e).__name__] * len(jobs)
+
+    for (_, target), error in zip(jobs, results):
+        for output_path in _image_paths(target):
+            if error:
+                print(f"⚠️  导出图片失败: {output_path}: {error}")
+            else:
+                print(f"✅ 图片已导出: {output_path}")
+    return results
 
 
 def export_html_to_image(html_path, output_path):
     """使用Playwright将HTML导出为JPG图片"""
+    return export_images([(html_path, output_path)], browsers=1, pages=1)[0] is None
+
+
+def _column_list(value):
+    """y 列可以写成列表或逗号分隔的字符串"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(name).strip() for name in value if str(name).strip()]
+
+
+def _parse_cell(text):
+    """CSV 单元格: 能解析为数字的转为数字，空单元格为 None"""
+    if not text.strip():
+        return None
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _to_float(value, column, row):
+    if value is None or value == '':
+        return math.nan
     try:
-        from playwright.sync_api import sync_playwright
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'第{row}行的 {column} 不是数值: {value!r}') from None
+
+
+def load_csv(path, x=None, y=None):
+    """逐行读取 CSV/TSV，只保留 x 列和 y 列，y 列以 array('d') 紧凑存放"""
+    delimiter = '\t' if Path(path).suffix.lower() == '.tsv' else ','
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = [name.strip() for name in next(reader, [])]
+        first = next(reader, None)
+        x = x or header[0]
+        if not y:
+            # 未指定时取第一行中是数值的列
+            y = [name for name, cell in zip(header, first or [])
+                 if name != x and (_is_number(_parse_cell(cell)) or not cell.strip())]
+        missing = [name for name in [x] + y if name not in header]
+        if missing:
+            raise ValueError(f'数据中没有列: {", ".join(missing)}（可用的列: {", ".join(header)}）')
+        x_index = header.index(x)
+        y_indexes = [(name, header.index(name), array.array('d')) for name in y]
+        xs = []
+        rows = itertools.chain([first] if first else [], reader)
+        for row_number, row in enumerate(rows, 2):
+            if not row:
+                continue
+            xs.append(_parse_cell(row[x_index]) if x_index < len(row) else None)
+            for name, index, values in y_indexes:
+                values.append(_to_float(row[index] if index < len(row) else None, name, row_number))
+    return {x: xs, **{name: values for name, _, values in y_indexes}}
+
+
+def load_ndjson(path, x=None, y=None):
+    """逐行读取 NDJSON（每行一个 JSON 对象），只保留 x 列和 y 列"""
+    xs = []
+    columns = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for row_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if columns is None:
+                # 未指定列时按第一条记录的字段决定
+                x = x or next(iter(record))
+                y = y or [name for name, value in record.items()
+                          if name != x and (value is None or _is_number(value))]
+                columns = [(name, array.array('d')) for name in y]
+            xs.append(record.get(x))
+            for name, values in columns:
+                values.append(_to_float(record.get(name), name, row_number))
+    if columns is None:
+        raise ValueError('数据文件为空')
+    return {x: xs, **dict(columns)}
+
+
+def load_arrow(path, x=None, y=None):
+    """读取 Parquet 或 Arrow IPC/Feather 文件，只读取需要的列（内存映射）"""
+    try:
+        import pyarrow.feather as feather
+        import pyarrow.parquet as parquet
     except ImportError:
-        print("⚠️  未安装 playwright，跳过图片导出")
-        print("💡 安装方法: pip install playwright && playwright install chromium")
-        return False
+        raise RuntimeError('读取 Parquet/Arrow 需要 pyarrow（pip install pyarrow）') from None
+    columns = [x] + y if x and y else None
+    if Path(path).suffix.lower() == '.parquet':
+        table = parquet.read_table(path, columns=columns, memory_map=True)
+    else:
+        table = feather.read_table(path, columns=columns, memory_map=True)
+    return {name: (table.column(name).to_numpy() if np is not None
+                   else table.column(name).to_pylist())
+            for name in (columns or table.column_names)}
+
+
+def load_npy(path, x=None, y=None):
+    """以内存映射方式读取 .npy
+
+    结构化数组的列为字段名；二维数组的列为 0、1、2...；一维数组为 index 和 value 两列。
+    """
+    if np is None:
+        raise RuntimeError('读取 .npy 需要 numpy（pip install numpy）')
+    values = np.load(path, mmap_mode='r', allow_pickle=False)
+    if values.dtype.names:
+        return {name: values[name] for name in values.dtype.names}
+    if values.ndim == 1:
+        return {'index': np.arange(len(values)), 'value': values}
+    if values.ndim == 2:
+        return {str(column): values[:, column] for column in range(values.shape[1])}
+    raise ValueError(f'不支持 {values.ndim} 维数组')
+
+
+TABLE_LOADERS = {
+    '.csv': load_csv,
+    '.tsv': load_csv,
+    '.ndjson': load_ndjson,
+    '.jsonl': load_ndjson,
+    '.parquet': load_arrow,
+    '.arrow': load_arrow,
+    '.feather': load_arrow,
+    '.npy': load_npy,
+}
+
+
+def _numeric(values):
+    """把 y 列转换为浮点数组（没有 numpy 时为列表，缺失值为 None）"""
+    if np is None:
+        return [None if value is None or value != value else value for value in values]
+    if isinstance(values, array.array):
+        return np.frombuffer(values, dtype=float)
+    return np.asarray(values, dtype=float)
+
+
+def _is_numeric_column(values):
+    if isinstance(values, array.array):
+        return True
+    if np is not None and isinstance(values, np.ndarray):
+        return values.dtype.kind in 'iuf'
+    return all(value is None or _is_number(value) for value in values)
+
+
+def table_to_data(table, chart_type, x=None, y=None):
+    """把按列读取的数据映射为图表数据
+
+    bar/line: x 列为 xAxis，每个 y 列为一个系列；scatter: 每个 y 列与 x 列组成一个系列的点；
+    pie: x 列为名称，第一个 y 列为数值。未指定时第一列为 x，其余列为 y。
+    """
+    names = list(table)
+    x = x or names[0]
+    y = y or [name for name in names if name != x and _is_numeric_column(table[name])]
+    missing = [name for name in [x] + y if name not in table]
+    if missing:
+        raise ValueError(f'数据中没有列: {", ".join(missing)}（可用的列: {", ".join(names)}）')
+    if not y:
+        raise ValueError('没有可用作数值的列')
+    xs = table[x]
+    if chart_type in ('bar', 'line'):
+        return {'xAxis': xs, 'series': [{'name': name, 'data': _numeric(table[name])} for name in y]}
+    if chart_type == 'scatter':
+        x_values = _numeric(xs)
+        if np is not None:
+            points = {name: np.column_stack([x_values, _numeric(table[name])]) for name in y}
+        else:
+            points = {name: [list(point) for point in zip(x_values, _numeric(table[name]))]
+                      for name in y}
+        return {'series': [{'name': name, 'data': points[name]} for name in y]}
+    if chart_type == 'pie':
+        return {'data': [{'name': name, 'value': value}
+                         for name, value in zip(to_builtin(xs), to_builtin(_numeric(table[y[0]])))]}
+    raise ValueError(f'{chart_type} 图表只支持 JSON 数据')
+
+
+def load_data(path, chart_type, x=None, y=None):
+    """读取图表数据文件: JSON 原样读取，其他格式按列读取后映射为图表数据"""
+    path = Path(path)
+    loader = TABLE_LOADERS.get(path.suffix.lower())
+    if loader is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return table_to_data(loader(path, x, y), chart_type, x, y)
+
+
+def to_builtin(value):
+    """把数组形式的数据转换为可以写入 JSON 的列表，NaN 写为 null"""
+    if isinstance(value, dict):
+        return {key: to_builtin(item) for key, item in value.items()}
+    if isinstance(value, list):
+        # JSON 读入的数值列表无需逐个转换
+        if value and isinstance(value[0], (dict, list)):
+            return [to_builtin(item) for item in value]
+        return value
+    if isinstance(value, array.array):
+        return [None if item != item else item for item in value]
+    if np is not None:
+        if isinstance(value, np.ndarray):
+            if value.dtype.kind == 'f':
+                result = value.astype(object)
+                result[np.isnan(value)] = None
+                return result.tolist()
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+    return value
+
+
+def _digest_array(value):
+    """计算渲染缓存键时，数组按内容哈希而不是展开成 JSON"""
+    if isinstance(value, array.array):
+        return [value.typecode, hashlib.sha256(value).hexdigest()]
+    if np is not None:
+        if isinstance(value, np.ndarray):
+            if value.dtype.kind == 'O':
+                return value.tolist()
+            value = np.ascontiguousarray(value)
+            return [value.dtype.str, value.shape, hashlib.sha256(value).hexdigest()]
+        if isinstance(value, np.generic):
+            return value.item()
+    raise TypeError(f'无法计算缓存键: {type(value).__name__}')
+
+
+def _take(values, indexes):
+    """按下标取出保留的数据点"""
+    if isinstance(values, np.ndarray):
+        return values[indexes]
+    return [values[i] for i in indexes]
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets 降采样，返回保留点的下标
+
+    首尾两点固定，其余点平均分成 threshold-2 个桶，每个桶保留与上一个保留点、
+    下一个桶的平均点构成的三角形面积最大的点，曲线的峰谷因此得以保留。
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = 1 + np.arange(threshold - 1) * (n - 2) // (threshold - 2)
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    # 每个桶的“下一个桶”的平均点，最后一个桶对应终点
+    next_x = np.append((np.add.reduceat(x[:n - 1], starts) / counts)[1:], x[-1])
+    next_y = np.append((np.add.reduceat(y[:n - 1], starts) / counts)[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        area = np.abs((x[a] - next_x[i]) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (next_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
 
+def _lttb_finite(x, y, threshold):
+    """跳过缺失值（None/NaN）后做 LTTB，返回原数组中的下标"""
+    finite = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    return finite[lttb_indices(x[finite], y[finite], threshold)]
+
+
+def downsample_line(data, max_points):
+    """折线图降采样
+
+    series.data 为 y 值列表（与 xAxis 对齐）时，各系列保留的下标取并集，
+    xAxis 和所有系列按同一组下标截取；为 [x, y] 点对时各系列独立降采样。
+    保留的都是原始数据点，数值不变。
+    """
+    series = data.get('series', [])
+    x_axis = data.get('xAxis', [])
+    try:
+        arrays = [np.asarray(s.get('data', []), dtype=float) for s in series]
+    except (TypeError, ValueError):
+        return data  # 含对象形式的数据点，保持原样
+    if not arrays or max(len(a) for a in arrays) <= max_points:
+        return data
+    budget = max(3, max_points // len(arrays))
+
+    if all(a.ndim == 2 and a.shape[1] >= 2 for a in arrays):
+        sampled = []
+        for s, a in zip(series, arrays):
+            keep = _lttb_finite(a[:, 0], a[:, 1], budget)
+            sampled.append({**s, 'data': _take(s['data'], keep)})
+        return {**data, 'series': sampled}
+    if any(a.ndim != 1 for a in arrays):
+        return data
+
+    n = max(len(a) for a in arrays)
+    try:
+        x = np.asarray(x_axis, dtype=float) if len(x_axis) == n else np.arange(n, dtype=float)
+    except (TypeError, ValueError):
+        x = np.arange(n, dtype=float)  # 类别轴按位置计算
+    keep = np.unique(np.concatenate([_lttb_finite(x[:len(a)], a, budget) for a in arrays]))
+    result = {**data, 'series': [{**s, 'data': _take(s['data'], keep[keep < len(s['data'])])}
+                                 for s in series]}
+    if len(x_axis) == n:
+        result['xAxis'] = _take(x_axis, keep)
+    print(f"📉 折线图 {n} 个点降采样为 {len(keep)} 个")
+    return result
+
+
+def bin_points(points, max_points):
+    """把散点合并到不超过 max_points 个网格中，返回 [[x均值, y均值, 点数]]"""
+    points = points[np.isfinite(points).all(axis=1)]
+    if not len(points):
+        return []
+    side = max(1, math.isqrt(max_points))
+    low = points.min(axis=0)
+    span = points.max(axis=0) - low
+    span[span == 0] = 1
+    cells = np.minimum(((points - low) / span * side).astype(np.int64), side - 1)
+    _, inverse, counts = np.unique(cells[:, 0] * side + cells[:, 1],
+                                   return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    mean_x = np.bincount(inverse, weights=points[:, 0]) / counts
+    mean_y = np.bincount(inverse, weights=points[:, 1]) / counts
+    return np.column_stack([mean_x, mean_y, counts]).tolist()
+
+
+def downsample_scatter(data, max_points):
+    """散点图降采样：按网格合并，每个点的第三个值为该格中的原始点数"""
+    series = data.get('series', [])
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch()
-            page = browser.new_page(viewport={'width': 1200, 'height': 700})
-            page.goto(f'file://{html_path}')
+        arrays = [np.asarray(s.get('data', []), dtype=float) for s in series]
+    except (TypeError, ValueError):
+        return data
+    total = sum(len(a) for a in arrays)
+    if total <= max_points or any(a.ndim != 2 or a.shape[1] < 2 for a in arrays if len(a)):
+        return data
+    budget = max(1, max_points // len(arrays))
+    sampled = [{**s, 'data': bin_points(a[:, :2], budget) if len(a) > budget else s['data']}
+               for s, a in zip(series, arrays)]
+    print(f"📉 散点图 {total} 个点合并为 {sum(len(s['data']) for s in sampled)} 个")
+    return {**data, 'series': sampled}
+
+
+DOWNSAMPLERS = {
+    'line': downsample_line,
+    'scatter': downsample_scatter,
+}
+
+
+def downsample(chart_type, data, max_points):
+    """点数超过 max_points 时对折线图、散点图降采样，其他情况原样返回"""
+    if chart_type not in DOWNSAMPLERS or not max_points:
+        return data
+    if np is None:
+        total = sum(len(s.get('data', [])) for s in data.get('series', []))
+        if total > max_points:
+            print(f"⚠️  数据共 {total} 个点，未安装 numpy，跳过降采样")
+            print("💡 安装方法: pip install numpy")
+        return data
+    return DOWNSAMPLERS[chart_type](data, max_points)
 
-            # 等待图表加载完成
-            page.wait_for_selector('#main', timeout=5000)
 
-            # 额外等待确保图表渲染完成
-            import time
-            time.sleep(1)
+def load_manifest(manifest_path):
+    """读取图表清单（.yaml/.yml 或 .json）
 
-            # 截图
-            page.screenshot(path=output_path, full_page=False)
+    清单格式:
+        defaults:            # 可选，所有图表共用的字段
+          export_jpg: true
+        charts:
+          - type: bar
+            data: data/perf.json      # 数据文件（相对清单所在目录），也可以直接写数据
+            title: 性能对比
+            output: html/perf.html    # 相对清单所在目录
+          - type: line
+            data: bench/latency.csv   # 按列读取的数据文件
+            x: step                   # 可选，默认第一列
+            y: [p50, p99]             # 可选，默认其余所有列
+            output: html/latency.html
+          - type: pie
+            data: data/share.json
+            dashboard: html/chapter01.html  # 同一 dashboard 的图表放进同一个页面
+            output: images/share.jpg        # 多图表页面中的图表只导出图片
 
-            browser.close()
+    也可以直接是图表列表。返回 [图表字段]，路径已解析为绝对路径。
+    """
+    manifest_path = Path(manifest_path)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        if manifest_path.suffix.lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("❌ 读取 YAML 清单需要 pyyaml\n💡 安装方法: pip install pyyaml")
+            manifest = yaml.safe_load(f)
+        else:
+            manifest = json.load(f)
 
-        print(f"✅ 图片已导出: {output_path}")
+    if isinstance(manifest, list):
+        manifest = {'charts': manifest}
+    defaults = manifest.get('defaults') or {}
+    base = manifest_path.parent
+    charts = []
+    for entry in manifest.get('charts') or []:
+        chart = {**defaults, **entry}
+        if isinstance(chart.get('data'), str):
+            chart['data'] = base / chart['data']
+        for field in ('output', 'dashboard'):
+            if chart.get(field):
+                chart[field] = base / chart[field]
+        charts.append(chart)
+    return charts
+
+
+class RenderCache:
+    """按内容寻址的渲染缓存
+
+    以 (图表类型, 数据, 标题, 降采样点数, 模板版本, 视口, ECharts 加载方式) 的哈希为键保存生成的
+    HTML 和导出的图片，内容相同的图表直接复制缓存结果，不再生成页面、不再启动浏览器。
+    总大小超过上限时淘汰最久未使用的条目。
+
+    缓存目录由所有进程共用：文件都先写入唯一的临时文件再改名，保存索引时加锁并与
+    磁盘上的索引合并。缓存读写出错只给出提示，不会让图表生成失败。
+    """
+
+    def __init__(self, directory, max_bytes=RENDER_CACHE_SIZE * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.index_path = self.directory / 'index.json'
+        self.lock_path = self.directory / 'index.lock'
+        # 文件名 -> {'size': 字节数, 'used': 最近使用时间}
+        self.entries = self._read_index()
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _write(self, name, write):
+        """通过唯一的临时文件写入缓存目录中的 name，write(f) 写入内容（二进制）"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f'{name}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, self.directory / name)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def key(chart_type, data, title, runtime_mode, max_points=0):
+        payload = json.dumps([chart_type, data, title, max_points, TEMPLATE_VERSION, VIEWPORT,
+                              runtime_mode, ECHARTS_VERSION],
+                             sort_keys=True, ensure_ascii=False, separators=(',', ':'),
+                             default=_digest_array)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def fetch(self, key, suffix, target):
+        """缓存命中时把结果复制到 target 并返回 True"""
+        name = key + suffix
+        path = self.directory / name
+        if name not in self.entries or not path.exists():
+            return False
+        Path(target).parent.mkdir(parents=True, exist_ok=True)
+        try:
+            shutil.copyfile(path, target)
+        except FileNotFoundError:
+            return False  # 刚被其他进程淘汰
+        self.entries[name]['used'] = time.time()
         return True
 
-    except Exception as e:
-        print(f"⚠️  导出图片失败: {e}")
-        return False
+    def store(self, key, suffix, source):
+        """把生成的结果加入缓存（超出上限的条目在 save 时淘汰）"""
+        name = key + suffix
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(source, 'rb') as f:
+                self._write(name, lambda out: shutil.copyfileobj(f, out))
+            self.entries[name] = {'size': (self.directory / name).stat().st_size,
+                                  'used': time.time()}
+        except OSError as e:
+            print(f"⚠️  写入渲染缓存失败: {e}")
+
+    def evict(self):
+        """按最近使用时间淘汰，直到总大小不超过上限"""
+        total = sum(entry['size'] for entry in self.entries.values())
+        for name in sorted(self.entries, key=lambda name: self.entries[name]['used']):
+            if total <= self.max_bytes:
+                break
+            total -= self.entries.pop(name)['size']
+            (self.directory / name).unlink(missing_ok=True)
+
+    def _merge(self, entries):
+        """把本进程的条目合并进磁盘上的索引
+
+        索引中没有的缓存文件（例如其他进程写入后索引丢失）也按修改时间加入，
+        这样它们同样计入大小并会被淘汰；文件已被删除的条目去掉。
+        """
+        for name, entry in self.entries.items():
+            if name not in entries or entry['used'] > entries[name]['used']:
+                entries[name] = entry
+        now = time.time()
+        with os.scandir(self.directory) as scan:
+            for item in scan:
+                if item.name in entries or item.name.startswith('index.') or not item.is_file():
+                    continue
+                stat = item.stat()
+                if item.name.endswith('.tmp') and now - stat.st_mtime < 3600:
+                    continue  # 其他进程正在写入
+                entries[item.name] = {'size': stat.st_size, 'used': stat.st_mtime}
+        return {name: entry for name, entry in entries.items()
+                if (self.directory / name).exists()}
+
+    def save(self):
+        """加锁后与磁盘上的索引合并、淘汰超出上限的条目，再写回索引"""
+        if not self.entries and not self.directory.exists():
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, 'a') as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)  # 关闭文件时释放
+                self.entries = self._merge(self._read_index())
+                self.evict()
+                self._write(self.index_path.name,
+                            lambda f: f.write(json.dumps(self.entries).encode('utf-8')))
+        except OSError as e:
+            print(f"⚠️  保存渲染缓存索引失败: {e}")
+
+
+def load_chart(chart, data_cache, runtime, max_points=MAX_POINTS):
+    """检查图表字段并读取数据，失败时抛出异常
+
+    返回 (图表类型, 数据, 标题, 降采样点数, 缓存键)。
+    """
+    chart_type = chart.get('type')
+    if chart_type not in CHART_TYPES:
+        raise ValueError(f'不支持的图表类型: {chart_type}')
+    if not chart.get('output'):
+        raise ValueError('缺少 output')
+
+    data = chart.get('data')
+    if isinstance(data, Path):
+        # 多张图表共用同一个数据文件时只读取一次；按列读取的文件还取决于列和图表类型
+        x, y = chart.get('x'), _column_list(chart.get('y'))
+        source = (data,)
+        if data.suffix.lower() in TABLE_LOADERS:
+            source = (data, chart_type, x, tuple(y or ()))
+        if source not in data_cache:
+            data_cache[source] = load_data(data, chart_type, x, y)
+        data = data_cache[source]
+    elif data is None:
+        raise ValueError('缺少 data')
+
+    title = chart.get('title', '图表')
+    max_points = chart.get('max_points', max_points)
+    # 没有 numpy 时不降采样，输出与 max_points 无关（仍把 max_points 交给 downsample 以提示安装）
+    key = RenderCache.key(chart_type, data, title, runtime.mode,
+                          max_points if np is not None else 0)
+    return chart_type, data, title, max_points, key
+
+
+def render_chart(chart, data_cache, export_jpg=False, runtime=None, cache=None, force=False,
+                 max_points=MAX_POINTS):
+    """生成一张图表，失败时抛出异常
+
+    返回 (需要导出的图片路径或 None, 缓存键, 是否完全来自缓存)。
+    """
+    runtime = runtime or CDN_RUNTIME
+    chart_type, data, title, max_points, key = load_chart(chart, data_cache, runtime, max_points)
+    output = Path(chart['output'])
+    image_path = output.with_suffix('.jpg') if chart.get('export_jpg', export_jpg) else None
+
+    if cache is not None and not force and cache.fetch(key, '.html', output):
+        if runtime.mode == 'local':
+            runtime.script_tag(output)  # 确保输出目录中有共用的 ECharts
+        if image_path is None or cache.fetch(key, '.jpg', image_path):
+            print(f"♻️  使用缓存: {output}")
+            return None, key, True
+        return image_path, key, False
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    generate_chart(chart_type, to_builtin(downsample(chart_type, data, max_points)), title, output,
+                   runtime)
+    if cache is not None:
+        cache.store(key, '.html', output)
+    return image_path, key, False
+
+
+def render_dashboard(dashboard, charts, data_cache, export_jpg=False, runtime=None, cache=None,
+                     force=False, max_points=MAX_POINTS):
+    """把多张图表放进同一个页面 dashboard，导出时一次加载逐个截取
+
+    每张图表的 output 只用于决定导出图片的路径（扩展名换成 .jpg）。返回
+    (需要导出的 [(位置, 元素选择器, 图片路径, 缓存键, 缓存后缀)], 每张图表的错误信息, 是否完全来自缓存)，
+    出错的图表不放进页面。
+    """
+    runtime = runtime or CDN_RUNTIME
+    dashboard = Path(dashboard)
+    errors = []
+    members = []
+    for position, chart in enumerate(charts):
+        try:
+            members.append((position, chart, load_chart(chart, data_cache, runtime, max_points)))
+            errors.append(None)
+        except Exception as e:
+            errors.append(str(e) or type(e).__name__)
+            print(f"❌ 图表 {chart.get('output')} 生成失败: {errors[-1]}")
+    if not members:
+        return [], errors, False
+
+    # 页面的缓存键由其中每张图表的缓存键决定
+    keys = [loaded[4] for _, _, loaded in members]
+    key = hashlib.sha256(json.dumps(['dashboard', dashboard.stem, keys]).encode('utf-8')).hexdigest()
+    images = [(position, f'#frame-{number}', Path(chart['output']).with_suffix('.jpg'), key,
+               f'.{number}.jpg')
+              for number, (position, chart, _) in enumerate(members, 1)
+              if chart.get('export_jpg', export_jpg)]
+
+    if cache is not None and not force and cache.fetch(key, '.html', dashboard):
+        if runtime.mode == 'local':
+            runtime.script_tag(dashboard)
+        missing = [image for image in images if not cache.fetch(image[3], image[4], image[2])]
+        if not missing:
+            print(f"♻️  使用缓存: {dashboard}")
+            return [], errors, True
+        return missing, errors, False
+
+    dashboard.parent.mkdir(parents=True, exist_ok=True)
+    charts = [(chart_type, to_builtin(downsample(chart_type, data, points)), title)
+              for _, _, (chart_type, data, title, points, _) in members]
+    with open(dashboard, 'w', encoding='utf-8') as f:
+        f.write(render_dashboard_page(charts, dashboard.stem, dashboard, runtime))
+    print(f"✅ 多图表页面已生成: {dashboard}（{len(charts)} 张图表）")
+    if cache is not None:
+        cache.store(key, '.html', dashboard)
+    return images, errors, False
+
+
+def render_charts(charts, export_jpg=False, browsers=2, pages=2, socket_path=None,
+                  render_timeout=RENDER_TIMEOUT, runtime=None, cache=None, force=False,
+                  max_points=MAX_POINTS):
+    """在一个进程中生成一批图表，返回 [(输出路径, 错误信息或 None, 耗时, 是否来自缓存)]
+
+    先生成全部 HTML（缓存命中的直接复制），再把需要导出的图片一次性交给浏览器池并发导出。
+    指定了 dashboard 的图表按 dashboard 分组放进同一个页面。
+    """
+    results = []
+    # 导出任务: (结果下标, HTML路径, 导出目标, [(缓存键, 缓存后缀, 图片路径)])
+    jobs = []
+    data_cache = {}
+    dashboards = {}
+    for index, chart in enumerate(charts, 1):
+        name = chart.get('output') or f'#{index}'
+        if chart.get('dashboard'):
+            dashboards.setdefault(Path(chart['dashboard']), []).append(len(results))
+            results.append((name, None, 0.0, False))
+            continue
+        started = time.perf_counter()
+        cached = False
+        try:
+            image_path, key, cached = render_chart(chart, data_cache, export_jpg, runtime,
+                                                   cache, force, max_points)
+            error = None
+        except Exception as e:
+            image_path = None
+            error = str(e) or type(e).__name__
+            print(f"❌ 图表 {name} 生成失败: {error}")
+        if image_path is not None:
+            jobs.append(([len(results)], chart['output'], image_path,
+                         [(key, '.jpg', image_path)]))
+        results.append((name, error, time.perf_counter() - started, cached))
+
+    for dashboard, indexes in dashboards.items():
+        started = time.perf_counter()
+        images, errors, cached = render_dashboard(dashboard, [charts[index] for index in indexes],
+                                                  data_cache, export_jpg, runtime, cache, force,
+                                                  max_points)
+        seconds = (time.perf_counter() - started) / len(indexes)
+        for index, error in zip(indexes, errors):
+            results[index] = (results[index][0], error, seconds, cached and error is None)
+        if images:
+            jobs.append(([indexes[position] for position, *_ in images], dashboard,
+                         [(selector, image_path) for _, selector, image_path, _, _ in images],
+                         [(key, suffix, image_path) for _, _, image_path, key, suffix in images]))
+
+    if jobs:
+        started = time.perf_counter()
+        errors = export_images([(html_path, target) for _, html_path, target, _ in jobs],
+                               browsers=browsers, pages=pages, socket_path=socket_path,
+                               render_timeout=render_timeout)
+        if EXPORT_SKIPPED not in errors:
+            count = sum(len(stores) for *_, stores in jobs)
+            print(f"🖼️  {count} 张图片导出耗时 {time.perf_counter() - started:.2f}s")
+        for (indexes, _, _, stores), error in zip(jobs, errors):
+            if error == EXPORT_SKIPPED:
+                continue  # HTML 已生成，只是没有导出图片
+            if error:
+                for index in indexes:
+                    name, _, seconds, cached = results[index]
+                    results[index] = (name, f'图片导出失败: {error}', seconds, cached)
+            elif cache is not None:
+                for key, suffix, image_path in stores:
+                    cache.store(key, suffix, image_path)
+
+    if cache is not None:
+        cache.save()
+    return results
+
+
+def render_manifest(manifest_path, dashboard=None, **options):
+    """在一个进程中生成清单中的所有图表，其他参数与 render_charts 相同
+
+    指定 dashboard 时，没有单独指定 dashboard 的图表都放进这个页面。
+    """
+    charts = load_manifest(manifest_path)
+    if dashboard:
+        for chart in charts:
+            chart.setdefault('dashboard', Path(dashboard))
+    print(f"📋 清单共 {len(charts)} 张图表")
+    return render_charts(charts, **options)
+
+
+def print_summary(results):
+    """逐张打印批量生成的结果"""
+    failures = [item for item in results if item[1]]
+    cached = sum(1 for item in results if item[3])
+    print(f"\n📊 批量生成结果: ✅ {len(results) - len(failures)} 成功  ❌ {len(failures)} 失败  "
+          f"♻️  {cached} 来自缓存")
+    for name, error, seconds, from_cache in results:
+        if error:
+            print(f"   ❌ {name} ({seconds:.2f}s): {error}")
+        else:
+            print(f"   ✅ {name} ({seconds:.2f}s){' (缓存)' if from_cache else ''}")
 
 
 def main():
     parser = argparse.ArgumentParser(description='生成Echart可视化图表')
-    parser.add_argument('--type', required=True, choices=['bar', 'line', 'pie', 'scatter', 'radar'],
-                        help='图表类型')
-    parser.add_argument('--data', required=True, help='数据JSON文件路径')
+    parser.add_argument('--type', choices=sorted(CHART_TYPES), help='图表类型')
+    parser.add_argument('--data',
+                        help='数据文件路径（JSON，或 CSV/TSV、NDJSON、Parquet、Arrow/Feather、.npy）')
+    parser.add_argument('--x', help='按列读取的数据中用作 x 轴（饼图为名称）的列，默认第一列')
+    parser.add_argument('--y', help='用作数值的列，逗号分隔，默认除 x 外的所有列')
     parser.add_argument('--title', default='图表', help='图表标题')
-    parser.add_argument('--output', required=True, help='输出HTML文件路径')
+    parser.add_argument('--output', help='输出HTML文件路径')
+    parser.add_argument('--manifest', help='图表清单文件（YAML 或 JSON），批量生成其中的所有图表')
+    parser.add_argument('--dashboard',
+                        help='把清单中的图表放进这一个 HTML 页面，导出时一次加载逐个截图')
     parser.add_argument('--export-jpg', action='store_true', help='同时导出为JPG图片（需要Playwright）')
+    parser.add_argument('--browsers', type=int, default=2, help='浏览器池中的 Chromium 实例数')
+    parser.add_argument('--pages', type=int, default=2, help='每个浏览器同时渲染的页面数')
+    parser.add_argument('--serve', action='store_true',
+                        help='启动常驻导出服务，其他调用的图片导出交给它完成')
+    parser.add_argument('--stop-server', action='store_true', help='停止常驻导出服务')
+    parser.add_argument('--socket', help='导出服务的套接字路径（默认在 $XDG_RUNTIME_DIR 或临时目录下当前用户独占的目录中）')
+    parser.add_argument('--echarts', choices=EchartsRuntime.MODES, default='cdn',
+                        help='ECharts 加载方式: cdn 联网加载；inline 内嵌到页面；'
+                             'local 在输出目录放一份本地副本（后两种需先 --fetch-echarts）')
+    parser.add_argument('--fetch-echarts', action='store_true',
+                        help=f'获取 ECharts {ECHARTS_VERSION} 到本地缓存目录并记录 SHA-256')
+    parser.add_argument('--echarts-source', help='--fetch-echarts 的来源（URL 或已下载的文件，默认 jsdelivr）')
+    parser.add_argument('--echarts-sha256',
+                        help=f'--fetch-echarts 时期望的 SHA-256，不符则拒绝'
+                             f'（默认为官方 ECharts {ECHARTS_VERSION} 的校验值，只在使用自行构建的版本时指定）')
+    parser.add_argument('--max-points', type=int, default=MAX_POINTS,
+                        help='折线图、散点图的最大点数，超过时降采样（默认 0，不降采样；大数据量时可设为 5000）')
+    parser.add_argument('--force', action='store_true', help='忽略渲染缓存，全部重新生成')
+    parser.add_argument('--cache-size', type=int, default=RENDER_CACHE_SIZE,
+                        help=f'渲染缓存大小上限（MB，默认{RENDER_CACHE_SIZE}，0 表示不使用缓存）')
+    parser.add_argument('--render-timeout', type=float, default=RENDER_TIMEOUT,
+                        help=f'等待图表渲染完成的最长时间（秒，默认{RENDER_TIMEOUT}）')
 
     args = parser.parse_args()
+    socket_path = Path(args.socket) if args.socket else default_socket_path()
 
-    # 读取数据
-    with open(args.data, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    # 根据类型生成图表
-    if args.type == 'bar':
-        generate_bar_chart(data, args.title, args.output)
-    elif args.type == 'line':
-        generate_line_chart(data, args.title, args.output)
-    elif args.type == 'pie':
-        generate_pie_chart(data, args.title, args.output)
-    elif args.type == 'scatter':
-        generate_scatter_chart(data, args.title, args.output)
-    elif args.type == 'radar':
-        generate_radar_chart(data, args.title, args.output)
-    else:
-        print(f"⚠️ 暂未实现 {args.type} 类型图表")
+    if args.fetch_echarts:
+        try:
+            bundle_path, digest = fetch_echarts(args.echarts_source, args.echarts_sha256)
+        except (OSError, ValueError) as e:
+            print(f"❌ 获取 ECharts 失败: {e}")
+            raise SystemExit(1)
+        print(f"✅ ECharts {ECHARTS_VERSION} 已保存: {bundle_path}")
+        print(f"🔒 SHA-256: {digest}")
         return
 
-    # 如果需要，导出为JPG
-    if args.export_jpg:
-        jpg_path = str(Path(args.output)).replace('.html', '.jpg')
-        export_html_to_image(args.output, jpg_path)
+    runtime = EchartsRuntime(args.echarts)
+    if args.echarts != 'cdn':
+        try:
+            runtime.bundle()
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            print("💡 离线机器可从其他机器拷贝 echarts.min.js 后运行: "
+                  "--fetch-echarts --echarts-source 文件路径 --echarts-sha256 校验值")
+            raise SystemExit(1)
+
+    if args.serve:
+        if not hasattr(socket, 'AF_UNIX'):
+            parser.error('当前系统不支持 Unix 套接字，无法启动导出服务')
+        try:
+            import playwright.async_api  # noqa: F401
+        except ImportError:
+            print("❌ 未安装 playwright")
+            print("💡 安装方法: pip install playwright && playwright install chromium")
+            raise SystemExit(1)
+        try:
+            asyncio.run(serve(socket_path, browsers=args.browsers, pages=args.pages,
+                              render_timeout=args.render_timeout))
+        except KeyboardInterrupt:
+            pass
+        except OSError as e:
+            print(f"❌ 无法启动导出服务: {e}")
+            raise SystemExit(1)
+        return
+
+    if args.stop_server:
+        if request_server(socket_path, {'stop': True}) is None:
+            print(f"⚠️  导出服务未运行: {socket_path}")
+        else:
+            print("✅ 已通知导出服务停止")
+        return
+
+    cache = None
+    if args.cache_size > 0:
+        cache = RenderCache(ECHARTS_CACHE_DIR / 'renders', args.cache_size * 1024 * 1024)
+    options = {
+        'export_jpg': args.export_jpg,
+        'socket_path': socket_path,
+        'render_timeout': args.render_timeout,
+        'runtime': runtime,
+        'cache': cache,
+        'force': args.force,
+        'max_points': args.max_points,
+    }
+
+    if args.dashboard and not args.manifest:
+        parser.error('--dashboard 需要与 --manifest 一起使用')
+    if args.manifest:
+        results = render_manifest(args.manifest, dashboard=args.dashboard, browsers=args.browsers,
+                                  pages=args.pages, **options)
+        print_summary(results)
+        if any(result[1] for result in results):
+            raise SystemExit(1)
+        return
+
+    if not (args.type and args.data and args.output):
+        parser.error('单张图表需要 --type、--data 和 --output（或使用 --manifest 批量生成）')
+
+    # 单张图表与批量生成走同一流程（包括缓存和图片导出）
+    chart = {'type': args.type, 'data': Path(args.data), 'title': args.title,
+             'output': Path(args.output), 'x': args.x, 'y': args.y}
+    results = render_charts([chart], browsers=1, pages=1, **options)
+    if results[0][1]:
+        raise SystemExit(1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,90 @@
+// Mermaid 语法校验进程 - 由 proofreading.py 启动，整本书只启动一次
+//
+// 启动后先输出一行 {"ready": true, "version": "..."}（找不到 mermaid 时为
+// {"ready": false, "error": "..."}），之后每从 stdin 读到一行 JSON 数组（一批图表代码），
+// 就输出一行同样长度的结果数组: [{"ok": true} | {"ok": false, "error": "...", "line": 2}]
+//
+// mermaid 依次在当前目录（书籍根目录）和 NODE_PATH 中查找:
+//   npm install mermaid jsdom          # 安装到书籍根目录
+//   NODE_PATH=$(npm root -g) ...       # 或使用全局安装的包
+
+import fs from 'node:fs';
+import path from 'node:path';
+import { createRequire } from 'node:module';
+import { createInterface } from 'node:readline';
+import { pathToFileURL } from 'node:url';
+
+const send = (message) => process.stdout.write(JSON.stringify(message) + '\n');
+
+const searchPaths = [
+  process.cwd(),
+  ...(process.env.NODE_PATH || '').split(path.delimiter).filter(Boolean),
+];
+const require = createRequire(path.join(process.cwd(), 'noop.js'));
+const resolve = (name) => require.resolve(name, { paths: searchPaths });
+
+function packageVersion(entry) {
+  // 从入口文件向上找到 mermaid 的 package.json
+  for (let dir = path.dirname(entry); dir !== path.dirname(dir); dir = path.dirname(dir)) {
+    const manifest = path.join(dir, 'package.json');
+    if (fs.existsSync(manifest)) {
+      const data = JSON.parse(fs.readFileSync(manifest, 'utf8'));
+      if (data.name === 'mermaid') return data.version;
+    }
+  }
+  return 'unknown';
+}
+
+async function loadMermaid() {
+  const entry = resolve('mermaid');
+  // mermaid 的部分图表类型依赖 DOM，安装了 jsdom 时提供一个
+  try {
+    const { JSDOM } = require(resolve('jsdom'));
+    const { window } = new JSDOM('');
+    globalThis.window = window;
+    globalThis.document = window.document;
+  } catch {
+    // 没有 jsdom 时大多数图表类型仍可解析
+  }
+  const mermaid = (await import(pathToFileURL(entry).href)).default;
+  mermaid.initialize({ startOnLoad: false });
+  return { mermaid, version: packageVersion(entry) };
+}
+
+function describe(error) {
+  // 解析错误形如 "Parse error on line 2:\n...\n----^\nExpecting ..., got ..."
+  const lines = String(error && error.message ? error.message : error)
+    .split('\n')
+    .map((line) => line.trim())
+    .filter(Boolean);
+  const message = lines.length > 1 ? `${lines[0]} ${lines[lines.length - 1]}` : lines[0] || 'unknown error';
+  const hash = (error && error.hash) || {};
+  const line = hash.loc ? hash.loc.first_line : (Number.isInteger(hash.line) ? hash.line + 1 : null);
+  return { ok: false, error: message, line };
+}
+
+let mermaid;
+try {
+  const loaded = await loadMermaid();
+  mermaid = loaded.mermaid;
+  send({ ready: true, version: loaded.version });
+} catch (error) {
+  send({ ready: false, error: String(error && error.message ? error.message : error).split('\n')[0] });
+  process.exit(0);
+}
+
+// 按顺序处理每一批，stdin 关闭时退出
+const input = createInterface({ input: process.stdin, crlfDelay: Infinity });
+for await (const line of input) {
+  if (!line.trim()) continue;
+  const results = [];
+  for (const code of JSON.parse(line)) {
+    try {
+      await mermaid.parse(code);
+      results.push({ ok: true });
+    } catch (error) {
+      results.push(describe(error));
+    }
+  }
+  send(results);
+}
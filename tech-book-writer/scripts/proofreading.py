@@ -11,25 +11,1061 @@
 """
 
 import re
+import os
+import json
+import hashlib
 import argparse
+import cProfile
+import pstats
+import importlib.util
+from importlib.metadata import entry_points
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from itertools import repeat
 from pathlib import Path
 from datetime import datetime
 import ast
+import time
+import random
+import posixpath
+import shutil
+import subprocess
+from urllib.parse import unquote
+
+
+# 检查逻辑变化时递增，使旧的缓存结果失效
+CHECKS_VERSION = '10'
+
+# 增量校对缓存文件名（位于书籍根目录，即章节目录的上一级）
+CACHE_FILENAME = '.proofreading-cache.json'
+
+# 超过该大小的章节自动使用流式模式，逐行读取，不把整个文件读入内存
+STREAM_THRESHOLD = 64 * 1024 * 1024
+
+# 流式模式下单个代码块在内存中保留的最大字符数，更大的代码块只记录行数和哈希
+FENCE_BODY_LIMIT = 1024 * 1024
+
+# 流式模式下段落、列表项、引用每次在内存中保留的最大字符数，更长的分段产出（Span.continued）
+PROSE_CHUNK_SIZE = 1024 * 1024
+
+# 内置的学术术语，未指定术语词典时使用
+DEFAULT_STYLE_TERMS = ['基于', '进行', '实现了', '具有较高的']
+
+# 内置检查项（按此顺序执行）；duplicates 为全书级检查，在所有章节检查完成后进行
+ALL_CHECKS = ['structure', 'code', 'images', 'mermaid', 'links', 'language', 'duplicates']
+
+# 插件检查项的 entry point 分组
+ENTRY_POINT_GROUP = 'tech_book_writer.proofreading_checks'
+
+# 代码块查重参数：按5个词元切分 shingle，64 个 MinHash 分为 16 个 LSH band
+SHINGLE_SIZE = 5
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+NEAR_DUPLICATE_THRESHOLD = 0.8
+MIN_FINGERPRINT_TOKENS = 10
+_MERSENNE_PRIME = (1 << 61) - 1
+_minhash_rng = random.Random(20260206)
+MINHASH_PARAMS = [(_minhash_rng.randrange(1, _MERSENNE_PRIME), _minhash_rng.randrange(_MERSENNE_PRIME))
+                  for _ in range(MINHASH_PERMUTATIONS)]
+
+# 全书级检查结果在耗时统计中使用的名称
+BOOK_SCOPE = '(全书)'
+
+# Mermaid 解析进程脚本，以及每次发送给它的图表数量
+MERMAID_WORKER = Path(__file__).with_name('mermaid_worker.mjs')
+MERMAID_BATCH_SIZE = 200
+
+# 孤立素材检查只关注图片文件
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.bmp'}
+
+# 建立素材索引时跳过的目录（依赖、构建产物），其中的图片不参与未引用检查
+SKIPPED_DIRS = {'node_modules', 'bower_components', '__pycache__', 'venv', 'site-packages',
+                'build', 'dist', '_build'}
+
+# 未引用素材检查的范围（相对书籍根目录）
+ASSETS_DIR = 'assets'
+
+# 规则编号及说明，用于机器可读的报告（JSONL/SARIF）
+RULES = {
+    'structure/missing-section': '缺少必需章节',
+    'structure/quiz-count': '选择题数量不足',
+    'code/missing-comment': '代码块缺少注释',
+    'code/too-long': '代码块过长',
+    'code/missing-import': '使用了库但缺少import语句',
+    'code/syntax-error': '代码块语法错误',
+    'code/duplicate': '代码块与其他位置完全重复',
+    'code/near-duplicate': '代码块与其他位置高度相似',
+    'images/missing-file': '图片文件不存在',
+    'images/case-mismatch': '图片路径大小写与实际文件不一致',
+    'images/orphaned': '素材文件未被任何章节引用',
+    'images/mermaid-type': 'Mermaid图表缺少类型声明',
+    'images/mermaid-syntax': 'Mermaid图表语法错误',
+    'links/missing-file': '链接指向的文件不存在',
+    'links/missing-anchor': '链接指向的锚点不存在',
+    'language/long-paragraph': '段落过长',
+    'language/academic-term': '使用了学术术语',
+}
+
+# 逐行分词使用的预编译模式（只匹配单行，不在全文上反复扫描）
+FENCE_OPEN_PATTERN = re.compile(r'^ {0,3}(`{3,}|~{3,})(.*)$')
+HEADING_PATTERN = re.compile(r'^ {0,3}(#{1,6})[ \t]+(.+?)[ \t]*$')
+LIST_ITEM_PATTERN = re.compile(r'^[ \t]*(\d+\.|[-*+])[ \t]+(.*)$')
+IMAGE_PATTERN = re.compile(r'!\[.*?\]\((.*?)\)')
+LINK_PATTERN = re.compile(r'(?<!!)\[[^\]]*\]\([ \t]*(<[^>]*>|[^)\s]+)')
+LINK_DEFINITION_PATTERN = re.compile(r'^ {0,3}\[[^\]]+\]:[ \t]*(<[^>]*>|\S+)')
+HTML_ANCHOR_PATTERN = re.compile(r'<a[ \t]+(?:id|name)="([^"]+)"')
+INLINE_CODE_PATTERN = re.compile(r'`[^`]*`')
+URL_SCHEME_PATTERN = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+TOKEN_PATTERN = re.compile(r"""("(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')|(\d+(?:\.\d+)?)|(\w+)|(\S)""")
+
+
+class Span:
+    """Markdown 分词得到的一个片段
+
+    kind 为 heading / fence / paragraph / list_item / table / quote 之一（table 每行一个片段）；
+    line、end_line 为起止行号（从1开始），offset 为起始字符偏移；
+    lines 为片段包含的原始行（fence 只包含围栏之间的代码行）；
+    info 为附加信息：heading 是 (级别, 标题文本)，fence 是围栏信息串，
+    list_item 是 (标记, 文本)；
+    omitted 仅用于流式模式下未保留代码的 fence：此时 lines 为空，omitted 为 OmittedBlock；
+    continued 仅用于流式模式下分段产出的长段落、列表项或引用：为 True 时接续上一个片段。
+    """
+
+    __slots__ = ('kind', 'line', 'end_line', 'offset', 'lines', 'info', 'omitted', 'continued')
+
+    def __init__(self, kind, line, offset, lines, info=None):
+        self.kind = kind
+        self.line = line
+        self.end_line = line + len(lines) - 1
+        self.offset = offset
+        self.lines = lines
+        self.info = info
+        self.omitted = None
+        self.continued = False
+
+    @property
+    def text(self):
+        return '\n'.join(self.lines)
+
+    def __repr__(self):
+        return f'Span({self.kind!r}, {self.line}-{self.end_line})'
+
+
+class OmittedBlock:
+    """流式模式下没有在内存中展开的代码块，只有代码行数和内容的 SHA-256（不需要代码时为 None）"""
+
+    __slots__ = ('line_count', 'digest')
+
+    def __init__(self, line_count, digest=None):
+        self.line_count = line_count
+        self.digest = digest
+
+    def __repr__(self):
+        return f'OmittedBlock({self.line_count} lines)'
+
+
+def tokenize_markdown(lines, fence_limit=None, prose_limit=None):
+    """逐行切分 Markdown，按顺序产出 Span
+
+    lines 可以是任意行迭代器（如打开的文件），不需要把全文读入内存。
+    围栏代码块内部的内容不会被识别为标题、列表或段落；未闭合的围栏延续到文件末尾。
+
+    fence_limit 为每个代码块最多保留的字符数（None 不限制）。超过后丢弃已保留的代码行，
+    片段的 omitted 记录代码行数；fence_limit 为正数时还计算代码的 SHA-256，
+    为 0 时（不需要代码的视图）完全不保留也不计算。
+
+    prose_limit 为段落、列表项、引用最多保留的字符数（None 不限制）。为正数时超过后
+    先产出已累积的部分，其余行作为 continued 片段继续；为 0 时只保留第一行，
+    end_line 仍是整个片段的最后一行（只需要行号、行数的视图）。
+    """
+    fence = None   # (代码块片段, 围栏字符, 围栏长度)
+    fence_size = fence_count = 0
+    digest = None  # 超过 fence_limit 后继续计算代码哈希
+    block = None   # 正在累积的段落、列表项、表格或引用
+    block_size = 0
+    offset = 0
+    number = 0
+    for number, raw in enumerate(lines, 1):
+        line = raw.rstrip('\r\n')
+        start, offset = offset, offset + len(raw)
+
+        if fence is not None:
+            span, char, length = fence
+            stripped = line.strip()
+            if (len(line) - len(line.lstrip(' ')) < 4 and stripped.startswith(char * length)
+                    and not stripped.strip(char)):
+                span.end_line = number
+                if span.omitted is not None:
+                    span.omitted = OmittedBlock(fence_count, digest and digest.hexdigest())
+                yield span
+                fence = None
+                continue
+            fence_count += 1
+            if fence_limit is None:
+                span.lines.append(line)
+                continue
+            fence_size += len(line) + 1
+            if span.omitted is None and fence_size > fence_limit:
+                # 代码块过大：丢弃已保留的行，之后只计算哈希
+                if fence_limit:
+                    digest = hashlib.sha256(''.join(l + '\n' for l in span.lines).encode('utf-8'))
+                span.lines = []
+                span.omitted = True
+            if span.omitted is None:
+                span.lines.append(line)
+            elif digest is not None:
+                digest.update((line + '\n').encode('utf-8'))
+            continue
+
+        match = FENCE_OPEN_PATTERN.match(line)
+        # 反引号围栏的信息串中不能再出现反引号（否则是行内代码）
+        if match and not (match.group(1)[0] == '`' and '`' in match.group(2)):
+            if block is not None:
+                yield block
+                block = None
+            span = Span('fence', number, start, [], match.group(2).strip())
+            fence = (span, match.group(1)[0], len(match.group(1)))
+            fence_size = fence_count = 0
+            digest = None
+            continue
+
+        kind = None
+        stripped = line.lstrip()
+        if not stripped:
+            kind = 'blank'
+        elif HEADING_PATTERN.match(line):
+            kind = 'heading'
+        elif LIST_ITEM_PATTERN.match(line):
+            kind = 'list_item'
+        elif stripped.startswith('|'):
+            kind = 'table'
+        elif stripped.startswith('>'):
+            kind = 'quote'
+
+        # 续行：引用的连续行合并；段落和列表项吸收后续的普通文本行。
+        # 表格每行单独成为一个片段，超大的数据表也不会整体留在内存中
+        if block is not None:
+            if (kind == 'quote' and block.kind == 'quote') or (
+                    kind is None and block.kind in ('paragraph', 'list_item')):
+                block.end_line = number
+                if prose_limit is None:
+                    block.lines.append(line)
+                    continue
+                block_size += len(line) + 1
+                if block_size <= prose_limit:
+                    block.lines.append(line)
+                elif prose_limit:
+                    yield block
+                    block = Span(block.kind, number, start, [line], block.info)
+                    block.continued = True
+                    block_size = len(line) + 1
+                continue
+            yield block
+            block = None
+
+        if kind == 'heading':
+            level, text = HEADING_PATTERN.match(line).groups()
+            yield Span('heading', number, start, [line], (len(level), text))
+        elif kind == 'list_item':
+            block = Span('list_item', number, start, [line], LIST_ITEM_PATTERN.match(line).groups())
+        elif kind is not None and kind != 'blank':
+            block = Span(kind, number, start, [line])
+        elif kind is None:
+            block = Span('paragraph', number, start, [line])
+        block_size = len(line) + 1
+
+    if block is not None:
+        yield block
+    if fence is not None:
+        span = fence[0]
+        span.end_line = number
+        if span.omitted is not None:
+            span.omitted = OmittedBlock(fence_count, digest and digest.hexdigest())
+        yield span
+
+
+class SpanView:
+    """流式模式下的视图：每次迭代都重新逐行读取章节文件
+
+    内存中只保留当前片段；代码块最多保留 fence_limit 个字符（不需要代码的视图为 0），
+    段落等片段的保留方式由 prose_limit 决定（见 tokenize_markdown）。
+    视图只能迭代，不能取长度或下标。
+    """
+
+    def __init__(self, path, derive, fence_limit=0, prose_limit=PROSE_CHUNK_SIZE):
+        self.path = path
+        self.derive = derive
+        self.fence_limit = fence_limit
+        self.prose_limit = prose_limit
+
+    def __iter__(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for span in tokenize_markdown(f, self.fence_limit, self.prose_limit):
+                yield from self.derive(span)
+
+
+def _span_itself(span):
+    yield span
+
+
+def _heading_of(span):
+    if span.kind == 'heading':
+        yield span.info
+
+
+def _code_block_of(span):
+    if span.kind == 'fence':
+        code = span.omitted or ''.join(line + '\n' for line in span.lines)
+        yield span.info, code, span.line
+
+
+def _image_refs_of(span):
+    if span.kind != 'fence':
+        for index, line in enumerate(span.lines):
+            for m in IMAGE_PATTERN.finditer(line):
+                yield m.group(1), span.line + index
+
+
+def _paragraph_of(span):
+    if span.kind == 'paragraph':
+        yield span.text
+
+
+def _paragraph_line_of(span):
+    if span.kind == 'paragraph':
+        yield span.line
+
+
+def _paragraph_size_of(span):
+    if span.kind == 'paragraph':
+        yield span.line, span.end_line - span.line + 1
+
+
+def _list_item_of(span):
+    if span.kind == 'list_item':
+        yield span.info
+
+
+def _links_of(span):
+    if span.kind != 'fence':
+        for index, line in enumerate(span.lines):
+            line = INLINE_CODE_PATTERN.sub('', line)
+            for m in LINK_PATTERN.finditer(line):
+                yield m.group(1).strip('<>'), span.line + index
+            m = LINK_DEFINITION_PATTERN.match(line)
+            if m:
+                yield m.group(1).strip('<>'), span.line + index
+
+
+def _html_anchors_of(span):
+    if span.kind != 'fence':
+        for line in span.lines:
+            yield from HTML_ANCHOR_PATTERN.findall(line)
+
+
+def heading_anchor(text):
+    """按 GitHub 的规则把标题转换为锚点：小写，去掉标点，空格换成连字符"""
+    return re.sub(r'[^\w\- ]', '', text.strip().lower()).replace(' ', '-')
+
+
+class Chapter:
+    """章节解析模型：每个文件只读取一次，供所有检查共享
+
+    文件逐行切分为 Span 后，各个视图（标题、代码块、图片引用、段落、列表项）
+    都从分词结果派生，且在第一次访问时才构建，引擎只准备活动检查声明需要的视图。
+
+    流式模式（stream=True）下视图不在内存中展开，而是每次迭代时重新逐行读取文件，
+    用于几百 MB 的超大章节。只有 code_blocks 视图保留代码，且超过 FENCE_BODY_LIMIT 的代码块
+    只有行数和哈希（OmittedBlock）；长段落按 PROSE_CHUNK_SIZE 分段，只需要行数的视图
+    不保留正文。除过大的代码块外，检查结果与普通模式相同。
+    """
+
+    # 可供检查声明的视图
+    VIEWS = ('content', 'spans', 'headings', 'code_blocks', 'image_refs', 'paragraphs',
+             'paragraph_lines', 'paragraph_sizes', 'list_items', 'links', 'anchors')
+
+    def __init__(self, chapter_file, stream=False):
+        self.path = Path(chapter_file)
+        self.name = self.path.stem
+        self.stream = stream
+        # 检查过程中记录的本地图片解析结果 {引用: 实际路径或 None}，供缓存失效判断
+        self.image_states = {}
+
+    def prepare(self, views):
+        """构建指定的视图"""
+        for view in views:
+            getattr(self, view)
+
+    def _view(self, derive, fence_limit=0, prose_limit=PROSE_CHUNK_SIZE):
+        if self.stream:
+            return SpanView(self.path, derive, fence_limit, prose_limit)
+        return [item for span in self.spans for item in derive(span)]
+
+    @cached_property
+    def content(self):
+        """全文（流式模式下同样会整体读入内存）"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    @cached_property
+    def spans(self):
+        """分词结果: [Span]
+
+        流式模式下 fence 片段不保留代码（见 Span.omitted），长段落分段产出（见 Span.continued）。
+        """
+        if self.stream:
+            return SpanView(self.path, _span_itself)
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return list(tokenize_markdown(f))
+
+    def prose_spans(self):
+        """围栏代码块以外的片段"""
+        return (span for span in self.spans if span.kind != 'fence')
+
+    @cached_property
+    def headings(self):
+        """标题: [(级别, 标题文本)]"""
+        return self._view(_heading_of, prose_limit=0)
+
+    @cached_property
+    def code_blocks(self):
+        """代码块: [(围栏信息串, 代码, 起始围栏所在行)]
+
+        流式模式下超过 FENCE_BODY_LIMIT 的代码块，代码为 OmittedBlock（行数和哈希）。
+        """
+        return self._view(_code_block_of, FENCE_BODY_LIMIT, prose_limit=0)
+
+    @cached_property
+    def image_refs(self):
+        """图片引用: [(路径, 行号)]，代码块中的内容不计入"""
+        return self._view(_image_refs_of)
+
+    @cached_property
+    def paragraphs(self):
+        """正文段落（不含标题、列表、表格、引用和代码块）
+
+        流式模式下每个段落仍整体读入内存，只需要行数时用 paragraph_sizes。
+        """
+        return self._view(_paragraph_of, prose_limit=None)
+
+    @cached_property
+    def paragraph_lines(self):
+        """每个段落首行的行号"""
+        return self._view(_paragraph_line_of, prose_limit=0)
+
+    @cached_property
+    def paragraph_sizes(self):
+        """每个段落的 (首行行号, 行数)，流式模式下不保留段落正文"""
+        return self._view(_paragraph_size_of, prose_limit=0)
+
+    @cached_property
+    def list_items(self):
+        """列表项: [(标记, 文本)]，有序列表标记形如 "1." """
+        return self._view(_list_item_of, prose_limit=0)
+
+    @cached_property
+    def links(self):
+        """链接（不含图片，跳过代码）: [(目标, 行号)]，包括引用式链接的定义"""
+        return self._view(_links_of)
+
+    @cached_property
+    def anchors(self):
+        """本章可被链接的锚点: 标题锚点（重名的依次加 -1、-2）和 HTML 锚点"""
+        anchors, counts = [], {}
+        for _, text in self.headings:
+            anchor = heading_anchor(text)
+            if anchor in counts:
+                counts[anchor] += 1
+                anchor = f'{anchor}-{counts[anchor]}'
+            else:
+                counts[anchor] = 0
+            anchors.append(anchor)
+        anchors.extend(self._view(_html_anchors_of))
+        return anchors
+
+    def blocks_of(self, language, omitted=False):
+        """返回指定语言的代码块: [(代码, 起始围栏所在行)]
+
+        围栏信息串的第一个词是语言，其后可以带属性（如 ```python session=demo）。
+        流式模式下过大的代码块默认跳过，omitted=True 时以 OmittedBlock 代替代码返回。
+        """
+        blocks = ((code, line) for info, code, line in self.code_blocks
+                  if info.split(None, 1)[:1] == [language]
+                  and (omitted or not isinstance(code, OmittedBlock)))
+        return blocks if self.stream else list(blocks)
+
+    @property
+    def numbered_items(self):
+        """有序列表项（测试题）数量"""
+        return sum(1 for marker, _ in self.list_items if marker[0].isdigit())
+
+
+class TermMatcher:
+    """Aho-Corasick 多模式匹配器
+
+    一次扫描文本即可找出词典中所有术语的出现位置，耗时只与文本长度和
+    命中数有关，不随词典规模增长。
+    """
+
+    def __init__(self, terms):
+        # terms: {术语: 替换建议或 None}
+        self.terms = dict(terms)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for term in self.terms:
+            self._add(term)
+        self._build_failure_links()
+        digest = hashlib.sha256()
+        for term in sorted(self.terms):
+            digest.update(f'{term}\t{self.terms[term] or ""}\n'.encode('utf-8'))
+        self.digest = digest.hexdigest()[:16]
+
+    @classmethod
+    def from_file(cls, path):
+        """从术语词典文件加载
+
+        每行一个术语，可用制表符分隔给出替换建议；空行和 # 开头的行被忽略。
+        """
+        terms = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                term, _, suggestion = line.partition('\t')
+                terms[term.strip()] = suggestion.strip() or None
+        return cls(terms)
+
+    def _add(self, term):
+        state = 0
+        for ch in term:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(term)
+
+    def _build_failure_links(self):
+        # 广度优先计算失败指针，并把失败状态的输出合并进来
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def finditer(self, text):
+        """依次产出 (术语, 行号, 列号)，行号和列号均从1开始"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        line = 1
+        line_start = 0
+        for pos, ch in enumerate(text):
+            if ch == '\n':
+                line += 1
+                line_start = pos + 1
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for term in output[state]:
+                yield term, line, pos - len(term) + 2 - line_start
+
+
+def fingerprint_block(code):
+    """计算代码块指纹: (精确哈希, MinHash 签名)，词元过少时返回 None
+
+    精确哈希基于原始词元（忽略空白差异）；MinHash 基于规范化词元，
+    字符串和数字字面量被替换为占位符，改了几个常量的代码仍能判为相似。
+    """
+    raw_tokens, tokens = [], []
+    for string, number, word, symbol in TOKEN_PATTERN.findall(code):
+        raw_tokens.append(string or number or word or symbol)
+        tokens.append('STR' if string else 'NUM' if number else word or symbol)
+    if len(tokens) < MIN_FINGERPRINT_TOKENS:
+        return None
+
+    exact = hashlib.sha1('\0'.join(raw_tokens).encode('utf-8')).hexdigest()[:16]
+    shingles = {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    # 用稳定的哈希函数，保证不同进程、不同运行之间签名一致（可以缓存）
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+              for shingle in shingles]
+    signature = [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in MINHASH_PARAMS]
+    return exact, signature
+
+
+def find_duplicate_blocks(fingerprints):
+    """在按书中顺序排列的指纹中查找重复代码块
+
+    fingerprints: [(精确哈希, MinHash 签名)]
+    返回 [(重复块下标, 更早出现的相似块下标, 相似度)]。近似重复通过 LSH 分桶
+    只比较落入同一个桶的候选，整体接近线性时间，不做两两比较。
+    """
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    first_by_exact = {}
+    buckets = {}
+    duplicates = []
+    for index, (exact, signature) in enumerate(fingerprints):
+        if exact in first_by_exact:
+            duplicates.append((index, first_by_exact[exact], 1.0))
+            continue
+        first_by_exact[exact] = index
+
+        candidates = set()
+        for band in range(LSH_BANDS):
+            key = (band, tuple(signature[band * rows:(band + 1) * rows]))
+            bucket = buckets.setdefault(key, [])
+            candidates.update(bucket)
+            bucket.append(index)
+
+        best, best_similarity = None, 0.0
+        for candidate in sorted(candidates):
+            other = fingerprints[candidate][1]
+            similarity = sum(x == y for x, y in zip(signature, other)) / MINHASH_PERMUTATIONS
+            if similarity > best_similarity:
+                best, best_similarity = candidate, similarity
+        if best is not None and best_similarity >= NEAR_DUPLICATE_THRESHOLD:
+            duplicates.append((index, best, best_similarity))
+    return duplicates
+
+
+def _clock():
+    """当前的 (墙钟时间, 本进程CPU时间)"""
+    return time.perf_counter(), time.process_time()
+
+
+def _elapsed(started):
+    """自 started 以来的 [墙钟时间, CPU时间]，单位秒"""
+    wall, cpu = _clock()
+    return [wall - started[0], cpu - started[1]]
+
+
+class CheckTimings:
+    """汇总各检查项、各章节的墙钟时间、CPU时间和调用次数"""
+
+    def __init__(self):
+        self.checks = {}    # 检查项 -> [调用次数, 墙钟时间, CPU时间]
+        self.chapters = {}  # 章节 -> {检查项: [墙钟时间, CPU时间]}
+
+    def add(self, chapter_name, timings):
+        """累加一个章节的耗时记录 {检查项: [墙钟时间, CPU时间]}"""
+        chapter = self.chapters.setdefault(chapter_name, {})
+        for check, (wall, cpu) in timings.items():
+            total = self.checks.setdefault(check, [0, 0.0, 0.0])
+            total[0] += 1
+            total[1] += wall
+            total[2] += cpu
+            previous = chapter.get(check, [0.0, 0.0])
+            chapter[check] = [previous[0] + wall, previous[1] + cpu]
+
+    def summary(self, top=10):
+        """生成耗时统计文本：各检查项总耗时和最慢的章节"""
+        lines = ["⏱  检查项耗时:",
+                 f"  {'检查项':<12}{'调用次数':>8}{'墙钟时间':>12}{'CPU时间':>12}"]
+        for check, (calls, wall, cpu) in sorted(self.checks.items(), key=lambda item: -item[1][1]):
+            lines.append(f"  {check:<15}{calls:>8}{wall:>14.3f}s{cpu:>12.3f}s")
+
+        lines.append(f"\n⏱  最慢的 {top} 个章节:")
+        totals = sorted(((sum(t[0] for t in timings.values()), name, timings)
+                         for name, timings in self.chapters.items()), reverse=True)
+        for wall, name, timings in totals[:top]:
+            slowest = max(timings, key=lambda check: timings[check][0])
+            lines.append(f"  {name:<30}{wall:>8.3f}s  （最慢: {slowest} {timings[slowest][0]:.3f}s）")
+        return '\n'.join(lines)
+
+
+def file_digest(path):
+    """分块计算文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AssetIndex:
+    """书籍根目录的文件索引
+
+    启动时只遍历一次目录树（跳过以 . 开头的目录和文件，以及 SKIPPED_DIRS 中的
+    目录），之后所有图片引用都在内存中解析，不再逐个访问文件系统。引用先按章节
+    文件所在目录解析（Markdown 的标准写法，如 ../assets/chapter01/images/x.png），
+    找不到再按书籍根目录解析（如 assets/chapter01/images/x.png）。
+    """
+
+    def __init__(self, book_root, chapters_dir, assets_dir=ASSETS_DIR):
+        self.root = Path(book_root)
+        self.chapters_dir = Path(chapters_dir).relative_to(self.root).as_posix()
+        # 未引用素材检查的范围（相对根目录的 POSIX 路径）
+        self.assets_dir = posixpath.normpath(Path(assets_dir).as_posix())
+        # 相对根目录的 POSIX 路径
+        self.files = set()
+        # 目录（相对根目录的 POSIX 路径，根目录为 '.'），用于检查指向目录的链接
+        self.directories = {'.'}
+        # 小写路径 -> 实际路径，用于发现大小写不一致的引用
+        self.folded = {}
+        pending = ['']
+        while pending:
+            directory = pending.pop()
+            try:
+                entries = os.scandir(self.root / directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    path = f'{directory}/{entry.name}' if directory else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        self.directories.add(path)
+                        if entry.name not in SKIPPED_DIRS:
+                            pending.append(path)
+                    else:
+                        self.files.add(path)
+                        self.folded.setdefault(path.lower(), path)
+
+    def candidates(self, ref):
+        """引用可能对应的相对根目录路径，按优先级排列"""
+        ref = ref.strip()
+        if ref.startswith('<') and '>' in ref:
+            ref = ref[1:ref.index('>')]      # ![图](<带空格的 路径.png>)
+        elif ref:
+            ref = ref.split()[0]             # ![图](路径.png "标题")
+        ref = unquote(ref.split('#')[0].split('?')[0])
+        if ref.startswith('/'):
+            return [posixpath.normpath(ref.lstrip('/'))]
+        return [posixpath.normpath(posixpath.join(self.chapters_dir, ref)),
+                posixpath.normpath(ref)]
+
+    def resolve(self, ref):
+        """解析图片引用，返回实际文件的相对路径，找不到返回 None
+
+        大小写不一致时返回实际文件的路径（与引用写法不同）。
+        """
+        candidates = self.candidates(ref)
+        for path in candidates:
+            if path in self.files:
+                return path
+        for path in candidates:
+            if path.lower() in self.folded:
+                return self.folded[path.lower()]
+        # 指向书籍根目录以外或跳过的目录中的引用不在索引中，直接访问文件系统
+        for path in candidates:
+            if ((path.startswith('../') or not SKIPPED_DIRS.isdisjoint(path.split('/')))
+                    and (self.root / path).exists()):
+                return path
+        return None
+
+    def resolve_link(self, ref):
+        """解析链接目标，文件或目录（如 ../code/chapter03/）都可以，找不到返回 None"""
+        path = self.resolve(ref)
+        if path is not None:
+            return path
+        candidates = self.candidates(ref)
+        for path in candidates:
+            if path in self.directories:
+                return path
+        for path in candidates:
+            if path.startswith('../') and (self.root / path).is_dir():
+                return path
+        return None
+
+    def assets(self):
+        """未引用检查范围内的图片文件（相对根目录的路径）"""
+        prefix = '' if self.assets_dir == '.' else self.assets_dir + '/'
+        return sorted(path for path in self.files
+                      if path.startswith(prefix)
+                      and posixpath.splitext(path)[1].lower() in IMAGE_EXTENSIONS)
+
+    def matches(self, ref, path):
+        """引用的写法是否与实际文件路径完全一致（区分大小写）"""
+        return path in self.candidates(ref)
+
+
+class MermaidValidator:
+    """通过常驻的 Node 进程（mermaid_worker.mjs）校验 Mermaid 图表语法
+
+    整本书只启动一个解析进程，图表按批发送；结果按 mermaid 版本和图表代码的
+    哈希缓存，未修改的图表不会重复解析。找不到 Node.js 或 mermaid 时 available 为
+    False，由调用方改用关键字检查。
+    """
+
+    def __init__(self, cwd, results=None):
+        self.cwd = Path(cwd)
+        # 哈希 -> 解析结果，可由持久化缓存预先填充
+        self.results = results if results is not None else {}
+        self.process = None
+        self.version = None
+        self.error = None
+
+    @property
+    def available(self):
+        if self.process is None and self.error is None:
+            self._start()
+        return self.error is None
+
+    def _start(self):
+        node = shutil.which('node')
+        if node is None:
+            self.error = '未找到 Node.js'
+            return
+        self.process = subprocess.Popen(
+            [node, str(MERMAID_WORKER)], cwd=self.cwd, text=True, encoding='utf-8',
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        ready = self._receive()
+        if not ready or not ready.get('ready'):
+            self.error = (ready or {}).get('error') or '解析进程启动失败'
+            self.close()
+            return
+        self.version = ready['version']
+
+    def _receive(self):
+        line = self.process.stdout.readline()
+        return json.loads(line) if line else None
+
+    def key(self, code):
+        return hashlib.sha256(f'{self.version}\0{code}'.encode('utf-8')).hexdigest()[:32]
+
+    def validate(self, codes):
+        """校验一组图表，返回同样顺序的结果 [{'ok': bool, 'error': str, 'line': int}]
+
+        只有缓存中没有的图表才发送给解析进程；调用前需确认 available。
+        解析进程中途退出（如内存不足被杀）时记录 error 并返回 None，
+        由调用方改用关键字检查。
+        """
+        keys = [self.key(code) for code in codes]
+        pending = {}
+        for key, code in zip(keys, codes):
+            if key not in self.results:
+                pending.setdefault(key, code)
+        pending = list(pending.items())
+        for start in range(0, len(pending), MERMAID_BATCH_SIZE):
+            batch = pending[start:start + MERMAID_BATCH_SIZE]
+            # 一批图表占一行，解析进程读完整行后才开始输出，不会因管道写满而互相等待
+            try:
+                self.process.stdin.write(json.dumps([code for _, code in batch]) + '\n')
+                self.process.stdin.flush()
+                results = self._receive()
+            except (OSError, ValueError):
+                results = None
+            if results is None:
+                process = self.process
+                self.close()
+                self.error = f'解析进程意外退出（退出码 {process.returncode}）'
+                return None
+            for (key, _), result in zip(batch, results):
+                self.results[key] = result
+        return [self.results[key] for key in keys]
+
+    def retain(self, codes):
+        """只保留这些图表的结果，已修改或删除的图表不再占用缓存"""
+        keys = {self.key(code) for code in codes}
+        self.results = {key: result for key, result in self.results.items() if key in keys}
+
+    def close(self):
+        """关闭解析进程（关闭 stdin 后进程自行退出）"""
+        if self.process is not None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                # 进程已退出，缓冲区中未写出的数据无处可去
+                pass
+            self.process.wait()
+            self.process = None
+
+
+class ProofreadingCache:
+    """按章节内容哈希持久化检查结果，跳过未修改的章节
+
+    缓存记录同时保存章节引用的本地图片当时是否存在，图片出现或消失时
+    对应章节的缓存失效。
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.chapters = {}
+        # Mermaid 图表的解析结果 {哈希: 结果}
+        self.mermaid = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == CHECKS_VERSION:
+                    self.chapters = data.get('chapters', {})
+                    self.mermaid = data.get('mermaid', {})
+            except (OSError, ValueError):
+                print(f"⚠️  缓存文件损坏，已忽略: {self.path}")
+
+    def lookup(self, name, digest, check_key, assets):
+        """返回命中的章节结果记录，未命中返回 None
+
+        assets 为书籍的 AssetIndex，用于确认章节引用的图片解析结果没有变化。
+        """
+        entry = self.chapters.get(name)
+        if not entry or entry['digest'] != digest or entry['checks'] != check_key:
+            return None
+        for img_path, resolved in entry['record']['images'].items():
+            if assets.resolve(img_path) != resolved:
+                return None
+        return entry['record']
+
+    def store(self, name, digest, check_key, record):
+        """保存章节结果记录"""
+        self.chapters[name] = {
+            'digest': digest,
+            'checks': check_key,
+            'record': record,
+        }
+
+    def save(self, names):
+        """写回缓存文件，只保留仍然存在的章节"""
+        chapters = {name: self.chapters[name] for name in names if name in self.chapters}
+        data = {'version': CHECKS_VERSION, 'chapters': chapters, 'mermaid': self.mermaid}
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+class CheckSpec:
+    """检查项的注册信息
+
+    views: 检查用到的章节视图（Chapter.VIEWS 中的名称），引擎只准备活动检查需要的视图
+    check: 章节检查 check(proofreader, chapter)，结果追加到 proofreader.issues/warnings
+    collect: 为全书级检查收集章节数据 collect(proofreader, chapter)，返回值需可 JSON 序列化
+    finalize: 全书级检查 finalize(proofreader, data, book_records)，
+              data 为 {章节路径: collect 的返回值}，结果按章节写入 book_records
+    version: 检查逻辑的版本，变化时缓存失效
+    """
+
+    def __init__(self, name, views=(), check=None, collect=None, finalize=None,
+                 version=CHECKS_VERSION):
+        for view in views:
+            if view not in Chapter.VIEWS:
+                raise ValueError(f'检查项 {name} 声明了未知的章节视图: {view}')
+        self.name = name
+        self.views = tuple(views)
+        self.check = check
+        self.collect = collect
+        self.finalize = finalize
+        self.version = version
+
+
+# 已注册的检查项：内置检查在 BookProofreader 定义之后注册，插件在第一次用到时才加载
+CHECKS = {}
+
+
+def register_check(name, views=(), check=None, collect=None, finalize=None,
+                   version=CHECKS_VERSION):
+    """注册检查项"""
+    CHECKS[name] = CheckSpec(name, views, check, collect, finalize, version)
+    return CHECKS[name]
+
+
+def fill_rules(findings, name):
+    """给没有规则编号的结果补上 <检查项>/unknown，报告中每条结果都能对应到规则"""
+    for finding in findings:
+        if not finding.get('rule'):
+            finding['rule'] = f'{name}/unknown'
+
+
+def available_checks(rules_dir=None):
+    """全部可用的检查项名称：内置检查、规则目录中的插件和 entry point 插件（不导入插件）"""
+    names = list(ALL_CHECKS)
+    if rules_dir:
+        names += sorted(path.stem for path in Path(rules_dir).glob('*.py')
+                        if not path.stem.startswith('_'))
+    names += sorted(ep.name for ep in entry_points(group=ENTRY_POINT_GROUP))
+    return list(dict.fromkeys(names))
+
+
+def load_check(name, rules_dir=None):
+    """按名称取得检查项，插件只在第一次用到时才导入
+
+    插件是一个 Python 模块（规则目录中的 <name>.py，或 entry point 指向的模块），
+    提供 VIEWS 和 check/collect/finalize 函数，可选提供 RULES（规则编号及说明）和 VERSION。
+    """
+    if name in CHECKS:
+        return CHECKS[name]
+
+    module = None
+    path = Path(rules_dir) / f'{name}.py' if rules_dir else None
+    if path is not None and path.is_file():
+        spec = importlib.util.spec_from_file_location(f'proofreading_rules_{name}', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    else:
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            if ep.name == name:
+                module = ep.load()
+                break
+    if module is None:
+        raise ValueError(f'未知的检查项: {name}')
+
+    RULES.update(getattr(module, 'RULES', {}))
+    # 插件报告的问题没有规则编号时归入 <检查项>/unknown
+    RULES.setdefault(f'{name}/unknown', f'{name} 检查发现的问题（插件未指定规则编号）')
+    return register_check(name,
+                          views=getattr(module, 'VIEWS', ()),
+                          check=getattr(module, 'check', None),
+                          collect=getattr(module, 'collect', None),
+                          finalize=getattr(module, 'finalize', None),
+                          version=str(getattr(module, 'VERSION', '0')))
 
 
 class BookProofreader:
-    def __init__(self, chapters_dir):
+    def __init__(self, chapters_dir, terms_file=None, rules_dir=None, stream=False,
+                 assets_dir=ASSETS_DIR):
         self.chapters_dir = Path(chapters_dir)
+        self.terms_file = terms_file
+        self.rules_dir = rules_dir
+        # 为 True 时所有章节都流式检查，否则只有超过 STREAM_THRESHOLD 的章节流式检查
+        self.stream = stream
+        # 未引用素材检查的范围（相对书籍根目录）
+        self.assets_dir = assets_dir
+        # 构造参数，进程池的工作进程据此创建相同配置的校对器
+        self.options = {'terms_file': terms_file, 'rules_dir': rules_dir, 'stream': stream,
+                        'assets_dir': assets_dir}
         self.issues = []
         self.warnings = []
         self.passed = []
+        # 每个章节的结果记录 {章节路径: record}，监视模式下只替换变化的章节
+        self.chapter_records = {}
+        # 本次运行中各检查项、各章节的耗时（缓存命中的章节不计入）
+        self.timings = CheckTimings()
         
-    def check_structure(self, chapter_file):
+    @cached_property
+    def asset_index(self):
+        """书籍根目录的文件索引，第一次检查图片时遍历一次目录树"""
+        return AssetIndex(self.chapters_dir.parent, self.chapters_dir, self.assets_dir)
+
+    @cached_property
+    def term_matcher(self):
+        """术语匹配器，只在语言风格检查用到时才加载词典"""
+        if self.terms_file:
+            return TermMatcher.from_file(self.terms_file)
+        return TermMatcher(dict.fromkeys(DEFAULT_STYLE_TERMS))
+    
+    @staticmethod
+    def _as_chapter(chapter):
+        """接受章节路径或已解析的 Chapter"""
+        if isinstance(chapter, Chapter):
+            return chapter
+        return Chapter(chapter)
+
+    def check_structure(self, chapter):
         """检查章节结构完整性"""
-        with open(chapter_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        chapter_name = chapter_file.stem
+        chapter = self._as_chapter(chapter)
+        chapter_name = chapter.name
+        heading_lines = [f"{'#' * level} {text}" for level, text in chapter.headings]
         required_sections = [
             '## 本章导读',
             '## 核心概念',
@@ -40,42 +1076,57 @@ class BookProofreader:
         ]
         
         for section in required_sections:
-            if section not in content:
+            if not any(section in heading for heading in heading_lines):
                 self.issues.append({
                     'chapter': chapter_name,
                     'type': '结构',
                     'level': 'error',
+                    'rule': 'structure/missing-section',
                     'message': f'缺少必需章节: {section}'
                 })
         
         # 检查测试题数量
-        choice_questions = len(re.findall(r'^\d+\.\s+', content, re.MULTILINE))
+        choice_questions = chapter.numbered_items
         if choice_questions < 5:
             self.warnings.append({
                 'chapter': chapter_name,
                 'type': '结构',
                 'level': 'warning',
+                'rule': 'structure/quiz-count',
                 'message': f'选择题数量不足: {choice_questions}/5'
             })
     
-    def check_code_blocks(self, chapter_file):
+    def check_code_blocks(self, chapter):
         """检查代码块"""
-        with open(chapter_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        chapter_name = chapter_file.stem
+        chapter = self._as_chapter(chapter)
+        chapter_name = chapter.name
         
         # 提取所有Python代码块
-        python_blocks = re.findall(r'```python\n(.*?)```', content, re.DOTALL)
+        python_blocks = chapter.blocks_of('python', omitted=True)
         
-        for idx, code in enumerate(python_blocks, 1):
+        for idx, (code, line) in enumerate(python_blocks, 1):
+            if isinstance(code, OmittedBlock):
+                # 流式模式下过大的代码块没有展开，只能按行数检查长度
+                if code.line_count > 50:
+                    self.warnings.append({
+                        'chapter': chapter_name,
+                        'type': '代码',
+                        'level': 'warning',
+                        'rule': 'code/too-long',
+                        'message': f'代码块 {idx} 超过50行 ({code.line_count}行)',
+                        'line': line
+                    })
+                continue
+
             # 检查是否有注释
             if '#' not in code and '"""' not in code:
                 self.warnings.append({
                     'chapter': chapter_name,
                     'type': '代码',
                     'level': 'warning',
-                    'message': f'代码块 {idx} 缺少注释'
+                    'rule': 'code/missing-comment',
+                    'message': f'代码块 {idx} 缺少注释',
+                    'line': line
                 })
             
             # 检查代码行数
@@ -85,7 +1136,9 @@ class BookProofreader:
                     'chapter': chapter_name,
                     'type': '代码',
                     'level': 'warning',
-                    'message': f'代码块 {idx} 超过50行 ({len(lines)}行)'
+                    'rule': 'code/too-long',
+                    'message': f'代码块 {idx} 超过50行 ({len(lines)}行)',
+                    'line': line
                 })
             
             # 检查常用库的import
@@ -95,7 +1148,9 @@ class BookProofreader:
                         'chapter': chapter_name,
                         'type': '代码',
                         'level': 'error',
-                        'message': f'代码块 {idx} 使用了库但缺少import语句'
+                        'rule': 'code/missing-import',
+                        'message': f'代码块 {idx} 使用了库但缺少import语句',
+                        'line': line
                     })
             
             # 尝试解析Python语法
@@ -106,104 +1161,482 @@ class BookProofreader:
                     'chapter': chapter_name,
                     'type': '代码',
                     'level': 'error',
-                    'message': f'代码块 {idx} 语法错误: {e.msg} (行{e.lineno})'
+                    'rule': 'code/syntax-error',
+                    'message': f'代码块 {idx} 语法错误: {e.msg} (行{e.lineno})',
+                    'line': line + (e.lineno or 1),
+                    'column': e.offset
                 })
     
-    def check_images(self, chapter_file):
+    def check_images(self, chapter):
         """检查插图引用"""
-        with open(chapter_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        chapter_name = chapter_file.stem
+        chapter = self._as_chapter(chapter)
+        chapter_name = chapter.name
         
         # 检查图片引用
-        image_refs = re.findall(r'!\[.*?\]\((.*?)\)', content)
-        for img_path in image_refs:
+        for img_path, line in chapter.image_refs:
             if img_path.startswith('http'):
                 continue  # 跳过外部链接
             
-            full_path = self.chapters_dir.parent / img_path
-            if not full_path.exists():
+            resolved = self.asset_index.resolve(img_path)
+            chapter.image_states[img_path] = resolved
+            if resolved is None:
                 self.issues.append({
                     'chapter': chapter_name,
                     'type': '插图',
                     'level': 'error',
-                    'message': f'图片文件不存在: {img_path}'
+                    'rule': 'images/missing-file',
+                    'message': f'图片文件不存在: {img_path}',
+                    'line': line
                 })
-        
-        # 检查Mermaid图表语法
-        mermaid_blocks = re.findall(r'```mermaid\n(.*?)```', content, re.DOTALL)
-        for idx, mermaid in enumerate(mermaid_blocks, 1):
-            if not any(keyword in mermaid for keyword in ['flowchart', 'sequenceDiagram', 'graph']):
-                self.warnings.append({
+            elif not self.asset_index.matches(img_path, resolved):
+                # 在不区分大小写的文件系统上能显示，部署到 Linux 后就会丢失
+                self.issues.append({
                     'chapter': chapter_name,
                     'type': '插图',
-                    'level': 'warning',
-                    'message': f'Mermaid图表 {idx} 可能缺少类型声明'
+                    'level': 'error',
+                    'rule': 'images/case-mismatch',
+                    'message': f'图片路径大小写与实际文件不一致: {img_path} (实际文件: {resolved})',
+                    'line': line
                 })
+
     
-    def check_language_style(self, chapter_file):
+    def check_language_style(self, chapter):
         """检查语言风格"""
-        with open(chapter_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        chapter_name = chapter_file.stem
+        chapter = self._as_chapter(chapter)
+        chapter_name = chapter.name
         
-        # 检查段落长度
-        paragraphs = content.split('\n\n')
-        for idx, para in enumerate(paragraphs):
-            lines = para.strip().split('\n')
-            # 跳过代码块和列表
-            if para.startswith('```') or para.startswith('-') or para.startswith('|'):
-                continue
-            if len(lines) > 5:
+        # 检查段落长度（分词结果中的段落不含代码块、列表和表格；只需要行数）
+        for idx, (para_line, line_count) in enumerate(chapter.paragraph_sizes, 1):
+            if line_count > 5:
                 self.warnings.append({
                     'chapter': chapter_name,
                     'type': '风格',
                     'level': 'warning',
-                    'message': f'段落 {idx} 过长 ({len(lines)}行)，建议拆分'
+                    'rule': 'language/long-paragraph',
+                    'message': f'段落 {idx} 过长 ({line_count}行)，建议拆分',
+                    'line': para_line
                 })
         
-        # 检查学术术语
-        academic_terms = ['基于', '进行', '实现了', '具有较高的']
-        for term in academic_terms:
-            if term in content:
-                self.warnings.append({
-                    'chapter': chapter_name,
-                    'type': '风格',
-                    'level': 'warning',
-                    'message': f'发现学术术语 "{term}"，建议使用日常语言'
-                })
+        # 检查学术术语（跳过代码块）
+        for term, line, column in self._prose_terms(chapter):
+            suggestion = self.term_matcher.terms[term]
+            advice = f'改为 "{suggestion}"' if suggestion else '使用日常语言'
+            self.warnings.append({
+                'chapter': chapter_name,
+                'type': '风格',
+                'level': 'warning',
+                'rule': 'language/academic-term',
+                'message': f'发现学术术语 "{term}" (行{line}, 列{column})，建议{advice}',
+                'line': line,
+                'column': column
+            })
     
+    def _prose_terms(self, chapter):
+        """在代码块以外的片段中匹配术语，产出 (术语, 行号, 列号)
+
+        术语不跨行，流式模式下分段产出的长段落逐段匹配，结果不变。
+        """
+        for span in chapter.prose_spans():
+            for term, line, column in self.term_matcher.finditer(span.text):
+                yield term, span.line + line - 1, column
+
     def check_chapter(self, chapter_file, checks):
         """检查单个章节"""
         print(f"📖 检查章节: {chapter_file.name}")
+        record = self._check_file(chapter_file, checks)
+        self.chapter_records[chapter_file] = record
+        self._merge_record(record)
+    
+    def _check_file(self, chapter_file, checks):
+        """检查单个章节，返回该章节的结果记录（不修改全书汇总）"""
+        issues, warnings = self.issues, self.warnings
+        self.issues, self.warnings = [], []
+        try:
+            specs = [load_check(name, self.rules_dir) for name in checks]
+            
+            # 只读取一次，只构建活动检查需要的视图，所有检查共享同一个章节模型
+            started = _clock()
+            stream = self.stream or os.path.getsize(chapter_file) >= STREAM_THRESHOLD
+            chapter = Chapter(chapter_file, stream=stream)
+            chapter.prepare({view for spec in specs for view in spec.views})
+            timings = {'parse': _elapsed(started)}
+            
+            # data 保存全书级检查从本章收集的数据，在所有章节检查完后使用
+            record = {
+                'issues': self.issues,
+                'warnings': self.warnings,
+                'images': chapter.image_states,
+                'timings': timings,
+                'data': {},
+            }
+            for spec in specs:
+                started = _clock()
+                if spec.check is not None:
+                    spec.check(self, chapter)
+                    fill_rules(self.issues + self.warnings, spec.name)
+                if spec.collect is not None:
+                    record['data'][spec.name] = spec.collect(self, chapter)
+                timings[spec.name] = _elapsed(started)
+            return record
+        finally:
+            self.issues, self.warnings = issues, warnings
+    
+    def _merge_record(self, record):
+        """把单个章节的结果并入全书汇总"""
+        self.issues.extend(record['issues'])
+        self.warnings.extend(record['warnings'])
+    
+    def run_checks(self, checks='all', jobs=1, cache=None, reporter=None):
+        """运行所有检查
+
+        jobs > 1 时把章节分发到多个工作进程，结果按章节顺序合并，
+        与串行运行的报告完全一致。传入 cache 时跳过内容未变化的章节。
+        传入 reporter 时每个章节的结果检查完即写出、不在内存中累积，
+        此时返回 None；否则返回 Markdown 报告。
+        """
+        check_list = self._check_list(checks)
+        chapter_files = sorted(self.chapters_dir.glob('*.md'))
+        check_key = self._check_key(check_list)
+        # 每次运行重新遍历一次素材目录，之后的图片引用和缓存校验都查这个索引
+        self.__dict__.pop('asset_index', None)
+        
+        # 先查缓存，只有未命中的章节才需要重新检查
+        cached, pending, digests = {}, [], {}
+        for chapter_file in chapter_files:
+            if cache is not None:
+                digests[chapter_file] = file_digest(chapter_file)
+                record = cache.lookup(chapter_file.name, digests[chapter_file],
+                                      check_key, self.asset_index)
+                if record is not None:
+                    cached[chapter_file] = record
+                    continue
+            pending.append(chapter_file)
         
-        if 'structure' in checks:
-            self.check_structure(chapter_file)
+        if jobs > 1 and len(pending) > 1:
+            # 素材索引在主进程中建好后传给工作进程，避免每个进程各自遍历目录
+            assets = self.asset_index if 'images' in check_list else None
+            executor = ProcessPoolExecutor(max_workers=jobs,
+                                           initializer=_init_worker,
+                                           initargs=(self.chapters_dir, self.options, assets))
+            # 每个进程分到若干批，减少进程间通信次数
+            chunksize = max(1, len(pending) // (jobs * 4))
+            results = executor.map(_check_chapter_worker, pending,
+                                   repeat(check_list), chunksize=chunksize)
+        else:
+            executor = None
+            results = map(self._check_file, pending, repeat(check_list))
         
-        if 'code' in checks:
-            self.check_code_blocks(chapter_file)
+        if cache is not None and 'mermaid' in check_list:
+            self.mermaid_validator.results.update(cache.mermaid)
         
-        if 'images' in checks:
-            self.check_images(chapter_file)
+        # 全书级检查所需的各章节数据
+        book_inputs = {}
+        try:
+            # 按章节顺序合并（map 按提交顺序返回结果），保证报告确定
+            for chapter_file in chapter_files:
+                if chapter_file in cached:
+                    print(f"📖 检查章节: {chapter_file.name} (缓存)")
+                    record = cached[chapter_file]
+                else:
+                    print(f"📖 检查章节: {chapter_file.name}")
+                    record = next(results)
+                    self.timings.add(chapter_file.name, record['timings'])
+                    if cache is not None:
+                        cache.store(chapter_file.name, digests[chapter_file],
+                                    check_key, record)
+                # 流式输出时不保留问题列表，只留下全书级检查需要的数据
+                book_inputs[chapter_file] = record['data']
+                if reporter is not None:
+                    reporter.report(chapter_file, record)
+                else:
+                    self.chapter_records[chapter_file] = record
+                    self._merge_record(record)
+        finally:
+            if executor is not None:
+                executor.shutdown()
         
-        if 'language' in checks:
-            self.check_language_style(chapter_file)
+        for chapter_file, record in self._check_book(check_list, book_inputs).items():
+            if reporter is not None:
+                reporter.report(chapter_file, record)
+            else:
+                self._merge_record(record)
+        
+        if cache is not None:
+            if 'mermaid' in check_list:
+                cache.mermaid = self.mermaid_validator.results
+            cache.save([f.name for f in chapter_files])
+        
+        if reporter is not None:
+            reporter.finish()
+            return None
+        return self.generate_report()
     
-    def run_checks(self, checks='all'):
-        """运行所有检查"""
-        if checks == 'all':
-            check_list = ['structure', 'code', 'images', 'language']
+    def watch(self, output, checks='all', jobs=1, cache=None, interval=0.5):
+        """监视模式：常驻内存，章节保存后只重新检查该章节并就地更新报告
+
+        通过轮询文件修改时间发现变化，其余章节的结果直接取自内存。
+        """
+        write_report(output, self.run_checks(checks, jobs=jobs, cache=cache))
+        print(f"📄 报告已保存: {output}")
+        print(f"👀 正在监视 {self.chapters_dir} （Ctrl+C 退出）")
+        
+        check_list = self._check_list(checks)
+        check_key = self._check_key(check_list)
+        snapshot = self._snapshot()
+        while True:
+            time.sleep(interval)
+            current = self._snapshot()
+            if current == snapshot:
+                continue
+            # 章节变化时素材可能也已更新，重新建立索引
+            self.__dict__.pop('asset_index', None)
+            
+            for chapter_file in sorted(current):
+                if snapshot.get(chapter_file) == current[chapter_file]:
+                    continue
+                print(f"📖 重新检查: {chapter_file.name}")
+                try:
+                    record = self._check_file(chapter_file, check_list)
+                except OSError:
+                    continue  # 文件正在被替换，下次轮询再检查
+                self.chapter_records[chapter_file] = record
+                if cache is not None:
+                    cache.store(chapter_file.name, file_digest(chapter_file),
+                                check_key, record)
+            for chapter_file in set(snapshot) - set(current):
+                print(f"🗑  章节已删除: {chapter_file.name}")
+                self.chapter_records.pop(chapter_file, None)
+            snapshot = current
+            
+            # 按章节顺序重建汇总，只重新渲染报告而不重新扫描其他章节
+            self.issues, self.warnings = [], []
+            records = {f: self.chapter_records[f] for f in sorted(self.chapter_records)}
+            for record in records.values():
+                self._merge_record(record)
+            data = {chapter_file: record['data'] for chapter_file, record in records.items()}
+            for record in self._check_book(check_list, data).values():
+                self._merge_record(record)
+            if cache is not None:
+                if 'mermaid' in check_list:
+                    cache.mermaid = self.mermaid_validator.results
+                cache.save([f.name for f in self.chapter_records])
+            write_report(output, self.generate_report())
+            print(f"📄 报告已更新: ❌ {len(self.issues)}  ⚠️  {len(self.warnings)}")
+    
+    def _snapshot(self):
+        """章节文件的 (修改时间, 大小) 快照"""
+        snapshot = {}
+        for entry in os.scandir(self.chapters_dir):
+            if entry.name.endswith('.md') and entry.is_file():
+                stat = entry.stat()
+                snapshot[self.chapters_dir / entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+    
+    def _check_book(self, check_list, data):
+        """全书级检查：基于各章节收集的数据进行跨章节检查
+
+        data: {章节路径: {检查项: 收集的数据}}，按章节顺序排列
+        返回 {章节路径: 该章节新增的结果记录}，按章节顺序排列
+        """
+        book_records = {}
+        for name in check_list:
+            spec = load_check(name, self.rules_dir)
+            if spec.finalize is None:
+                continue
+            started = _clock()
+            spec.finalize(self, {chapter_file: chapter_data[name]
+                                 for chapter_file, chapter_data in data.items()
+                                 if name in chapter_data}, book_records)
+            for record in book_records.values():
+                fill_rules(record['issues'] + record['warnings'], name)
+            self.timings.add(BOOK_SCOPE, {name: _elapsed(started)})
+        return dict(sorted(book_records.items()))
+    
+    def collect_image_refs(self, chapter):
+        """本章引用到的素材文件（相对书籍根目录的实际路径）"""
+        return sorted({path for path in chapter.image_states.values() if path})
+
+    def check_orphaned_assets(self, data, book_records):
+        """找出素材目录（assets_dir）中没有被任何章节引用的图片文件
+
+        data: {章节路径: collect_image_refs 的结果}
+        """
+        referenced = {path for paths in data.values() for path in paths}
+        root = self.chapters_dir.parent
+        for path in self.asset_index.assets():
+            if path in referenced:
+                continue
+            record = book_records.setdefault(root / path, {'issues': [], 'warnings': []})
+            record['warnings'].append({
+                'chapter': BOOK_SCOPE,
+                'type': '插图',
+                'level': 'warning',
+                'rule': 'images/orphaned',
+                'message': f'素材文件未被任何章节引用: {path}'
+            })
+
+    @cached_property
+    def mermaid_validator(self):
+        """Mermaid 解析器，第一次校验图表时才启动，监视模式下一直保持运行"""
+        return MermaidValidator(self.chapters_dir.parent)
+
+    def collect_mermaid_blocks(self, chapter):
+        """本章的 Mermaid 图表: [[起始围栏所在行, 代码]]"""
+        return [[line, code] for code, line in chapter.blocks_of('mermaid')]
+
+    def check_mermaid(self, data, book_records):
+        """校验全书的 Mermaid 图表语法
+
+        所有章节的图表一起分批交给同一个解析进程；没有可用的解析器时
+        退回到检查图表类型关键字。
+        data: {章节路径: collect_mermaid_blocks 的结果}
+        """
+        validator = self.mermaid_validator
+        codes = [code for blocks in data.values() for _, code in blocks]
+        results = validator.validate(codes) if codes and validator.available else None
+        if results is not None:
+            results = iter(results)
+            validator.retain(codes)
         else:
-            check_list = checks.split(',')
+            if codes and validator.version is not None:
+                # 解析进程启动过但中途退出，已解析的结果仍保留在缓存中
+                print(f"⚠️  Mermaid {validator.error}，改用关键字检查")
+            elif codes:
+                print(f"⚠️  Mermaid 解析器不可用（{validator.error}），改用关键字检查。"
+                      f"安装: npm install mermaid jsdom")
+            results = None
         
-        chapter_files = sorted(self.chapters_dir.glob('*.md'))
+        for chapter_file, blocks in data.items():
+            for idx, (line, code) in enumerate(blocks, 1):
+                if results is not None:
+                    result = next(results)
+                    if result['ok']:
+                        continue
+                    finding = {
+                        'level': 'error',
+                        'rule': 'images/mermaid-syntax',
+                        'message': f"Mermaid图表 {idx} 语法错误: {result['error']}",
+                        'line': line + result['line'] if result.get('line') else line
+                    }
+                elif not any(keyword in code for keyword in ['flowchart', 'sequenceDiagram', 'graph']):
+                    finding = {
+                        'level': 'warning',
+                        'rule': 'images/mermaid-type',
+                        'message': f'Mermaid图表 {idx} 可能缺少类型声明',
+                        'line': line
+                    }
+                else:
+                    continue
+                record = book_records.setdefault(chapter_file, {'issues': [], 'warnings': []})
+                record['issues' if finding['level'] == 'error' else 'warnings'].append({
+                    'chapter': chapter_file.stem,
+                    'type': '插图',
+                    **finding
+                })
+
+    def collect_links(self, chapter):
+        """本章在全书锚点索引中的条目，以及本章的所有链接"""
+        return {
+            'anchors': chapter.anchors,
+            'links': [[target, line] for target, line in chapter.links],
+        }
+
+    def check_links(self, data, book_records):
+        """用全书的锚点索引检查章节间链接和 #锚点
+
+        索引的每个条目随章节结果一起缓存，增量运行只重新收集修改过的章节。
+        data: {章节路径: collect_links 的结果}
+        """
+        anchors = {chapter_file.name: set(entry['anchors']) for chapter_file, entry in data.items()}
+        chapters_dir = self.asset_index.chapters_dir
         
-        for chapter_file in chapter_files:
-            self.check_chapter(chapter_file, check_list)
+        for chapter_file, entry in data.items():
+            for target, line in entry['links']:
+                if URL_SCHEME_PATTERN.match(target):
+                    continue  # 外部链接、mailto 等
+                path, _, fragment = target.partition('#')
+                path, fragment = unquote(path), unquote(fragment)
+                if not path:
+                    chapter_name = chapter_file.name
+                else:
+                    resolved = posixpath.normpath(posixpath.join(chapters_dir, path))
+                    directory, chapter_name = posixpath.split(resolved)
+                    if directory != chapters_dir or chapter_name not in anchors:
+                        # 指向章节以外的文件（代码、数据等），只检查文件是否存在
+                        chapter_name = None
+                        if self.asset_index.resolve_link(path) is None:
+                            rule, message = 'links/missing-file', f'链接指向的文件不存在: {target}'
+                            self._add_link_issue(book_records, chapter_file, rule, message, line)
+                if chapter_name is not None and fragment and fragment not in anchors[chapter_name]:
+                    rule, message = 'links/missing-anchor', f'链接指向的锚点不存在: {target}'
+                    self._add_link_issue(book_records, chapter_file, rule, message, line)
+
+    @staticmethod
+    def _add_link_issue(book_records, chapter_file, rule, message, line):
+        record = book_records.setdefault(chapter_file, {'issues': [], 'warnings': []})
+        record['issues'].append({
+            'chapter': chapter_file.stem,
+            'type': '链接',
+            'level': 'error',
+            'rule': rule,
+            'message': message,
+            'line': line
+        })
+
+    def fingerprint_blocks(self, chapter):
+        """记录本章每个代码块的指纹: [[行号, 精确哈希, MinHash 签名]]"""
+        return [[line, *fingerprint]
+                for _, code, line in chapter.code_blocks if not isinstance(code, OmittedBlock)
+                for fingerprint in [fingerprint_block(code)] if fingerprint]
+    
+    def check_duplicates(self, data, book_records):
+        """跨章节检查完全重复和高度相似的代码块
+
+        data: {章节路径: fingerprint_blocks 的结果}
+        """
+        blocks = [(chapter_file, line) for chapter_file, fingerprints in data.items()
+                  for line, _, _ in fingerprints]
+        fingerprints = [(exact, signature) for chapter_fingerprints in data.values()
+                        for _, exact, signature in chapter_fingerprints]
         
-        return self.generate_report()
+        for index, original, similarity in find_duplicate_blocks(fingerprints):
+            chapter_file, line = blocks[index]
+            other_file, other_line = blocks[original]
+            where = '本章' if other_file == chapter_file else other_file.stem
+            if similarity == 1.0:
+                rule = 'code/duplicate'
+                message = f'代码块 (行{line}) 与{where}第{other_line}行的代码块完全重复'
+            else:
+                rule = 'code/near-duplicate'
+                message = f'代码块 (行{line}) 与{where}第{other_line}行的代码块高度相似 (相似度{similarity:.0%})'
+            record = book_records.setdefault(chapter_file, {'issues': [], 'warnings': []})
+            record['warnings'].append({
+                'chapter': chapter_file.stem,
+                'type': '代码',
+                'level': 'warning',
+                'rule': rule,
+                'message': message,
+                'line': line
+            })
+    
+    def _check_list(self, checks):
+        """把 --checks 参数解析为检查项列表，并加载其中用到的插件"""
+        if checks == 'all':
+            names = available_checks(self.rules_dir)
+        else:
+            names = [name.strip() for name in checks.split(',') if name.strip()]
+        for name in names:
+            load_check(name, self.rules_dir)
+        # 内置检查按固定顺序执行，报告顺序与参数顺序无关
+        return ([name for name in ALL_CHECKS if name in names] +
+                [name for name in names if name not in ALL_CHECKS])
+    
+    def _check_key(self, check_list):
+        """检查集合的标识，检查逻辑、检查项或术语词典变化时缓存失效"""
+        key = ','.join(f'{name}@{CHECKS[name].version}' for name in check_list)
+        if 'language' in check_list:
+            key += f':{self.term_matcher.digest}'
+        return key
     
     def generate_report(self):
         """生成校对报告"""
@@ -262,31 +1695,241 @@ class BookProofreader:
         return report
 
 
+class JsonlReporter:
+    """逐条写出 JSON Lines 格式的检查结果"""
+
+    def __init__(self, stream, book_root):
+        self.stream = stream
+        self.book_root = Path(book_root)
+        self.error_count = 0
+        self.warning_count = 0
+
+    def report(self, chapter_file, record):
+        """写出单个章节的全部结果"""
+        uri = Path(chapter_file).relative_to(self.book_root).as_posix()
+        for finding in record['issues'] + record['warnings']:
+            if finding['level'] == 'error':
+                self.error_count += 1
+            else:
+                self.warning_count += 1
+            self.write(uri, finding)
+        self.stream.flush()
+
+    def write(self, uri, finding):
+        json.dump({
+            'file': uri,
+            'chapter': finding['chapter'],
+            'line': finding.get('line'),
+            'column': finding.get('column'),
+            'rule': finding.get('rule'),
+            'severity': finding['level'],
+            'type': finding['type'],
+            'message': finding['message'],
+        }, self.stream, ensure_ascii=False)
+        self.stream.write('\n')
+
+    def finish(self):
+        pass
+
+
+class SarifReporter(JsonlReporter):
+    """逐条写出 SARIF 2.1.0 格式的检查结果
+
+    文件头在开始时写出，每条结果产生时立即追加，结束时补齐 JSON 结构。
+    """
+
+    def __init__(self, stream, book_root):
+        super().__init__(stream, book_root)
+        self.first = True
+        self.started = False
+
+    def start(self):
+        """写出文件头；插件的规则编号在加载后才登记，因此推迟到第一条结果前"""
+        self.started = True
+        header = {
+            'version': '2.1.0',
+            '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+            'runs': [{
+                'tool': {'driver': {
+                    'name': 'proofreading',
+                    'rules': [{'id': rule, 'shortDescription': {'text': text}}
+                              for rule, text in RULES.items()],
+                }},
+                'results': [],
+            }],
+        }
+        # 去掉末尾的 "]}]}"，之后逐条写入 results 数组
+        text = json.dumps(header, ensure_ascii=False)
+        self.stream.write(text[:-len(']}]}')])
+
+    def write(self, uri, finding):
+        if not self.started:
+            self.start()
+        location = {'artifactLocation': {'uri': uri}}
+        if finding.get('line'):
+            location['region'] = {'startLine': finding['line']}
+            if finding.get('column'):
+                location['region']['startColumn'] = finding['column']
+        result = {
+            'level': finding['level'],
+            'message': {'text': finding['message']},
+            'locations': [{'physicalLocation': location}],
+        }
+        # 旧缓存中可能还有没有规则编号的结果，SARIF 中省略 ruleId 而不是写 null
+        if finding.get('rule'):
+            result = {'ruleId': finding['rule'], **result}
+        if not self.first:
+            self.stream.write(',')
+        self.first = False
+        self.stream.write('\n')
+        json.dump(result, self.stream, ensure_ascii=False)
+
+    def finish(self):
+        if not self.started:
+            self.start()
+        self.stream.write('\n]}]}\n')
+
+
+REPORTERS = {'jsonl': JsonlReporter, 'sarif': SarifReporter}
+
+
+# 内置检查项及其消费的章节视图
+register_check('structure', views=('headings', 'list_items'),
+               check=BookProofreader.check_structure)
+register_check('code', views=('code_blocks',),
+               check=BookProofreader.check_code_blocks)
+register_check('images', views=('image_refs',),
+               check=BookProofreader.check_images,
+               collect=BookProofreader.collect_image_refs,
+               finalize=BookProofreader.check_orphaned_assets)
+register_check('mermaid', views=('code_blocks',),
+               collect=BookProofreader.collect_mermaid_blocks,
+               finalize=BookProofreader.check_mermaid)
+register_check('links', views=('links', 'anchors'),
+               collect=BookProofreader.collect_links,
+               finalize=BookProofreader.check_links)
+register_check('language', views=('spans', 'paragraph_sizes'),
+               check=BookProofreader.check_language_style)
+register_check('duplicates', views=('code_blocks',),
+               collect=BookProofreader.fingerprint_blocks,
+               finalize=BookProofreader.check_duplicates)
+
+
+def write_report(output, report):
+    """写入报告文件（先写临时文件再替换，避免读到写了一半的报告）"""
+    output = Path(output)
+    tmp_path = output.with_name(output.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(report)
+    os.replace(tmp_path, output)
+
+
+_worker_proofreader = None
+
+
+def _init_worker(chapters_dir, options, asset_index=None):
+    """进程池初始化：每个工作进程只创建一个校对器"""
+    global _worker_proofreader
+    _worker_proofreader = BookProofreader(chapters_dir, **options)
+    if asset_index is not None:
+        _worker_proofreader.asset_index = asset_index
+
+
+def _check_chapter_worker(chapter_file, check_list):
+    """进程池工作函数：检查单个章节，返回结果记录"""
+    return _worker_proofreader._check_file(chapter_file, check_list)
+
+
 def main():
     parser = argparse.ArgumentParser(description='技术书籍质量校对')
     parser.add_argument('--input', required=True, help='章节目录路径')
-    parser.add_argument('--output', default='校对报告.md', help='输出报告路径')
+    parser.add_argument('--output', help='输出报告路径（默认 校对报告.md/.jsonl/.sarif）')
     parser.add_argument('--checks', default='all', 
-                        help='检查项目: all, structure, code, images, language')
+                        help='检查项目: all, structure, code, images, language, duplicates 或插件检查项')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='并行工作进程数（默认1，0表示使用全部CPU核心）')
+    parser.add_argument('--cache', action='store_true',
+                        help=f'启用增量缓存，跳过内容未变化的章节（保存在书籍根目录 {CACHE_FILENAME}）')
+    parser.add_argument('--rules-dir', help='插件检查项目录（每个 <检查项>.py 文件是一个检查项）')
+    parser.add_argument('--terms', help='术语词典文件（每行一个术语，可用制表符分隔替换建议）')
+    parser.add_argument('--assets-dir', default=ASSETS_DIR,
+                        help=f'未引用素材检查的范围，相对书籍根目录（默认 {ASSETS_DIR}）')
+    parser.add_argument('--stream', action='store_true',
+                        help='流式检查所有章节（逐行读取，代码块正文只为需要它的检查项保留，'
+                             '单个超过1MB的代码块只记录行数和哈希；超过64MB的章节总是流式检查）')
+    parser.add_argument('--format', choices=['md', 'jsonl', 'sarif'], default='md',
+                        help='报告格式: md（默认）, jsonl, sarif；jsonl/sarif 边检查边写出')
+    parser.add_argument('--profile', action='store_true',
+                        help='输出各检查项和最慢章节的耗时统计')
+    parser.add_argument('--profile-output',
+                        help='将 cProfile 统计数据保存到该文件（可用 pstats/snakeviz 查看）')
+    parser.add_argument('--watch', action='store_true',
+                        help='监视模式：章节保存后自动重新检查并更新报告')
+    parser.add_argument('--interval', type=float, default=0.5,
+                        help='监视模式的轮询间隔秒数（默认0.5）')
     
     args = parser.parse_args()
+    if args.output is None:
+        args.output = f'校对报告.{args.format}'
+    if args.watch and args.format != 'md':
+        parser.error('监视模式仅支持 md 格式报告')
     
     print("🔍 开始质量校对...")
     print(f"📂 检查目录: {args.input}")
     print(f"📋 检查项目: {args.checks}\n")
     
-    proofreader = BookProofreader(args.input)
-    report = proofreader.run_checks(args.checks)
+    proofreader = BookProofreader(args.input, terms_file=args.terms, rules_dir=args.rules_dir,
+                                  stream=args.stream, assets_dir=args.assets_dir)
+    try:
+        proofreader._check_list(args.checks)
+    except ValueError as e:
+        parser.error(str(e))
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache = None
+    if args.cache:
+        cache = ProofreadingCache(Path(args.input).parent / CACHE_FILENAME)
+    if args.watch:
+        try:
+            proofreader.watch(args.output, args.checks, jobs=jobs, cache=cache,
+                              interval=args.interval)
+        except KeyboardInterrupt:
+            print("\n👋 已退出监视模式")
+        return
     
-    # 保存报告
-    with open(args.output, 'w', encoding='utf-8') as f:
-        f.write(report)
+    profiler = None
+    if args.profile_output:
+        if jobs > 1:
+            print("⚠️  cProfile 只统计主进程，工作进程中的检查耗时请看 --profile 输出\n")
+        profiler = cProfile.Profile()
+        profiler.enable()
+    
+    if args.format == 'md':
+        report = proofreader.run_checks(args.checks, jobs=jobs, cache=cache)
+        # 保存报告
+        write_report(args.output, report)
+        error_count, warning_count = len(proofreader.issues), len(proofreader.warnings)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            reporter = REPORTERS[args.format](f, proofreader.chapters_dir.parent)
+            proofreader.run_checks(args.checks, jobs=jobs, cache=cache, reporter=reporter)
+        error_count, warning_count = reporter.error_count, reporter.warning_count
+    
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile_output)
     
     print(f"\n✅ 校对完成!")
     print(f"📄 报告已保存: {args.output}")
     print(f"\n统计:")
-    print(f"  - 严重问题: {len(proofreader.issues)}")
-    print(f"  - 警告: {len(proofreader.warnings)}")
+    print(f"  - 严重问题: {error_count}")
+    print(f"  - 警告: {warning_count}")
+    
+    if args.profile:
+        print()
+        print(proofreader.timings.summary())
+    if profiler is not None:
+        print(f"\n📊 cProfile 数据已保存: {args.profile_output}")
+        pstats.Stats(args.profile_output).sort_stats('cumulative').print_stats(10)
 
 
 if __name__ == '__main__':
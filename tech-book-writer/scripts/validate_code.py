@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+代码验证脚本 - 实际运行书中的代码示例
+
+功能:
+- 提取章节中所有 ```python 代码块
+- 每个代码块在独立的子进程中运行，限制运行时间和内存
+- 多个子进程并行运行
+- 按代码块内容哈希缓存结果，未修改的示例不会重复运行
+- 同一章节中标记为同一会话的代码块共享一个解释器，按顺序运行
+
+代码块属性（写在围栏信息串中）:
+    ```python session=demo    同一章节中 session 相同的代码块依次在同一解释器中运行
+    ```python norun           不运行该代码块（如故意写错的反例、代码片段）
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from proofreading import Chapter
+
+
+# 运行器逻辑变化时递增，使旧的缓存结果失效
+RUNNER_VERSION = '3'
+
+# 可以运行验证的语言
+SUPPORTED_LANGUAGES = ['python']
+
+# 缓存目录名（位于书籍根目录，即章节目录的上一级）
+CACHE_DIRNAME = '.validate-code-cache'
+
+# 在子进程中执行的运行器：先按命令行参数设置内存上限，再从 stdin 读取一个会话的
+# 代码块，在同一命名空间中依次执行，每个代码块的结果以一行 JSON 写入结果文件
+# （不与示例自身的输出混在一起）
+# 参数: 结果文件路径, 内存上限（字节）, 每个代码块的运行时间上限（秒）
+# 每个代码块单独计时（墙钟时间，包括 sleep 和等待）；整个会话的 CPU 时间上限按
+# 代码块数放大，只用来兜底卡在 C 代码中收不到计时信号的情况
+RUNNER = r'''
+import json, math, signal, sys, traceback
+try:
+    import resource
+except ImportError:  # Windows 不支持资源限制
+    resource = None
+
+class BlockTimeout(BaseException):
+    pass
+
+def on_alarm(signum, frame):
+    raise BlockTimeout()
+
+memory, timeout = int(sys.argv[2]), float(sys.argv[3])
+if resource is not None:
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+blocks = json.load(sys.stdin)
+if resource is not None:
+    cpu = math.ceil(timeout) * len(blocks) + 1
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))  # 先收到 SIGXCPU，按超时报告
+timer = hasattr(signal, 'setitimer')
+if timer:
+    signal.signal(signal.SIGALRM, on_alarm)
+namespace = {'__name__': '__main__'}
+with open(sys.argv[1], 'w', encoding='utf-8') as out:
+    for index, code in enumerate(blocks, 1):
+        filename = f'<block {index}>'
+        result = {'status': 'ok'}
+        try:
+            if timer:
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            try:
+                exec(compile(code, filename, 'exec'), namespace)
+            finally:
+                if timer:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+        except BlockTimeout:
+            result = {'status': 'timeout'}
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                result = {'status': 'error', 'error': f'SystemExit: {e.code}'}
+        except BaseException as e:
+            frames = [f for f in traceback.extract_tb(e.__traceback__) if f.filename == filename]
+            result = {
+                'status': 'memory' if isinstance(e, MemoryError) else 'error',
+                'error': ''.join(traceback.format_exception_only(type(e), e)).strip(),
+                'line': frames[-1].lineno if frames else getattr(e, 'lineno', None),
+            }
+        out.write(json.dumps(result, ensure_ascii=False) + '\n')
+        out.flush()
+        if result['status'] != 'ok':
+            break
+'''
+
+STATUS_LABELS = {
+    'error': '运行出错',
+    'memory': '内存超限',
+    'timeout': '运行超时',
+    'crashed': '子进程异常退出',
+    'skipped': '未运行（同一会话中前面的代码块失败）',
+}
+
+
+def parse_attributes(info):
+    """解析围栏信息串中语言之后的属性，如 "python session=demo norun" """
+    attributes = {}
+    for token in info.split()[1:]:
+        key, _, value = token.partition('=')
+        attributes[key] = value or True
+    return attributes
+
+
+def collect_sessions(chapter_file):
+    """把章节中的 Python 代码块分组为会话
+
+    返回 [(会话名, [(代码块序号, 起始行, 代码)])]；未指定 session 的代码块各自独立。
+    """
+    chapter = Chapter(chapter_file)
+    sessions = {}
+    index = 0
+    for info, code, line in chapter.code_blocks:
+        if info.split(None, 1)[:1] != ['python']:
+            continue
+        index += 1
+        attributes = parse_attributes(info)
+        if attributes.get('norun'):
+            continue
+        name = attributes.get('session') or f'#{index}'
+        sessions.setdefault(name, []).append((index, line, code))
+    return list(sessions.items())
+
+
+class CodeValidator:
+    """在隔离的子进程中运行代码块，并按内容哈希缓存结果"""
+
+    def __init__(self, timeout=10, memory_mb=512, cache_dir=None):
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def session_key(self, codes):
+        """会话的缓存键：代码内容、运行器版本、资源限制和解释器版本"""
+        digest = hashlib.sha256()
+        digest.update(f'{RUNNER_VERSION}:{self.timeout}:{self.memory_mb}:{sys.version}'.encode('utf-8'))
+        for code in codes:
+            digest.update(b'\0')
+            digest.update(code.encode('utf-8'))
+        return digest.hexdigest()
+
+    def run_session(self, codes):
+        """运行一个会话，返回 (每个代码块的结果, 是否来自缓存)"""
+        key = self.session_key(codes)
+        cache_path = self.cache_dir / f'{key}.json' if self.cache_dir else None
+        if cache_path and cache_path.exists():
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    return json.load(f), True
+            except (OSError, ValueError):
+                pass
+
+        results = self._execute(codes)
+
+        # 超时可能由机器繁忙引起，不缓存
+        if cache_path and not any(r['status'] == 'timeout' for r in results):
+            # 内容相同的会话可能在多个线程中同时运行，临时文件名必须唯一
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f'{key}.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(results, f, ensure_ascii=False)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                Path(tmp_path).unlink(missing_ok=True)
+        return results, False
+
+    def _execute(self, codes):
+        with tempfile.TemporaryDirectory(prefix='validate_code_') as workdir:
+            result_path = Path(workdir) / 'results.jsonl'
+            env = dict(os.environ, MPLBACKEND='Agg', PYTHONDONTWRITEBYTECODE='1')
+            # 资源上限由运行器自己设置，不使用 preexec_fn（在多线程中 fork 后执行 Python 代码不安全）
+            limits = [str(self.memory_mb * 1024 * 1024), str(self.timeout)]
+            stderr = []
+            try:
+                completed = subprocess.run(
+                    [sys.executable, '-I', '-c', RUNNER, str(result_path), *limits],
+                    input=json.dumps(codes), text=True, cwd=workdir, env=env,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                    # 各代码块由运行器单独计时，这里只兜底（另加解释器启动的时间）
+                    timeout=self.timeout * len(codes) + 5,
+                )
+                timed_out = completed.returncode == -getattr(signal, 'SIGXCPU', 0)
+                stderr = completed.stderr.strip().splitlines()
+            except subprocess.TimeoutExpired:
+                timed_out = True
+
+            results = []
+            if result_path.exists():
+                with open(result_path, 'r', encoding='utf-8') as f:
+                    results = [json.loads(line) for line in f if line.strip()]
+
+        if len(results) < len(codes) and (not results or results[-1]['status'] == 'ok'):
+            # 子进程在代码块执行中途被终止（超时、CPU 时间上限或崩溃）
+            if timed_out:
+                results.append({'status': 'timeout'})
+            else:
+                results.append({'status': 'crashed', 'error': stderr[-1] if stderr else None})
+        results += [{'status': 'skipped'}] * (len(codes) - len(results))
+        return results
+
+
+def validate_chapters(chapters_dir, validator, jobs=4):
+    """并行运行所有章节的代码块，返回 {章节名: [(代码块序号, 起始行, 结果)]}"""
+    chapter_files = sorted(Path(chapters_dir).glob('*.md'))
+    tasks = []
+    for chapter_file in chapter_files:
+        for _, blocks in collect_sessions(chapter_file):
+            tasks.append((chapter_file.stem, blocks))
+
+    # 代码在子进程中运行，线程只负责等待，GIL 不是瓶颈
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        outcomes = executor.map(lambda task: validator.run_session([code for _, _, code in task[1]]),
+                                tasks)
+        report = {chapter_file.stem: [] for chapter_file in chapter_files}
+        cached = 0
+        for (chapter_name, blocks), (results, from_cache) in zip(tasks, outcomes):
+            cached += from_cache
+            for (index, line, _), result in zip(blocks, results):
+                report[chapter_name].append((index, line, result))
+
+    for results in report.values():
+        results.sort(key=lambda item: item[0])
+    return report, len(tasks), cached
+
+
+def main():
+    parser = argparse.ArgumentParser(description='验证书中代码示例的可运行性')
+    parser.add_argument('--chapters', required=True, help='章节目录路径')
+    parser.add_argument('--language', default='python',
+                        help='编程语言，多个用 | 或逗号分隔（目前支持 python）')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='并行运行的子进程数')
+    parser.add_argument('--timeout', type=float, default=10, help='每个代码块的运行时间上限（秒）')
+    parser.add_argument('--memory', type=int, default=512, help='每个子进程的内存上限（MB）')
+    parser.add_argument('--no-cache', action='store_true', help='不使用结果缓存，全部重新运行')
+
+    args = parser.parse_args()
+
+    languages = [name.strip().lower() for name in args.language.replace(',', '|').split('|')
+                 if name.strip()]
+    unsupported = [name for name in languages if name not in SUPPORTED_LANGUAGES]
+    if 'python' not in languages:
+        # 不能什么都没验证就以退出码0结束，否则 CI 会误以为通过
+        parser.error(f'暂未实现 {", ".join(unsupported) or args.language} 代码验证'
+                     f'（目前支持: {", ".join(SUPPORTED_LANGUAGES)}）')
+    if unsupported:
+        print(f"⚠️  暂未实现 {', '.join(unsupported)} 代码验证，只验证 python 代码块")
+
+    cache_dir = None if args.no_cache else Path(args.chapters).parent / CACHE_DIRNAME
+    validator = CodeValidator(timeout=args.timeout, memory_mb=args.memory, cache_dir=cache_dir)
+
+    print("🔍 开始运行代码示例...")
+    report, sessions, cached = validate_chapters(args.chapters, validator, jobs=args.jobs)
+    print(f"📦 共 {sessions} 个会话，{cached} 个来自缓存\n")
+
+    failures = 0
+    for chapter_name, results in report.items():
+        if not results:
+            continue
+        problems = [(index, line, result) for index, line, result in results
+                    if result['status'] != 'ok']
+        if not problems:
+            print(f"✅ {chapter_name}: {len(results)}个代码块全部通过")
+            continue
+        failures += len(problems)
+        print(f"❌ {chapter_name}: 发现{len(problems)}个问题")
+        for index, line, result in problems:
+            detail = result.get('error') or STATUS_LABELS[result['status']]
+            location = f"(行{line + result['line']})" if result.get('line') else f"(行{line})"
+            print(f"   - 代码块 {index} {location}: {detail}")
+
+    print(f"\n{'✅ 全部通过' if not failures else f'❌ 共 {failures} 个代码块未通过'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()